@@ -0,0 +1,104 @@
+"""
+End-to-end benchmark of the GAME loop with a scripted (offline) LLM.
+
+Drives property_search_agent's Agent through search_property ->
+summarize_options -> terminate over synthetic datasets of increasing size
+and reports the time spent per stage. Run from the repository root:
+    python -m benchmarks.bench_agent_loop --sizes 1000 10000 100000 --sessions 20
+    python -m benchmarks.bench_agent_loop --save-baseline bench_baseline.json
+    python -m benchmarks.bench_agent_loop --baseline bench_baseline.json
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+import module.config as config
+from module.tracing import Tracer
+from module.game import Environment
+from module.llm_cache import InMemoryLRUCache
+from module.fake_llm import ScriptedResponses, last_tool_result
+from benchmarks.synthetic import make_properties, make_criteria
+from property_search_agent import build_agent
+
+STAGES = ["prompt_build", "llm", "parse", "tool_execution", "memory_update"]
+# a stage this much slower than the baseline is reported as a regression
+REGRESSION_THRESHOLD = 0.20
+
+
+def make_script(criteria: dict) -> list:
+    return [
+        {"tool": "search_property", "args": {"search_criteria": criteria, "partial_search": False}},
+        lambda prompt: {"tool": "summarize_options",
+                        "args": {"search_results": (last_tool_result(prompt) or {}).get("search_results", [])[:5]}},
+        {"tool": "terminate", "args": {"message": "Here is a summary of the matching properties."}},
+    ]
+
+
+def run_size(size: int, sessions: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = os.path.join(tmp, "properties.json")
+        with open(data_path, "w") as f:
+            json.dump(make_properties(size), f)
+        config.PROPERTY_DATA_PATH = data_path
+
+        tracer = Tracer()
+        agent = build_agent(tags=["search_property", "summarize_options", "system"],
+                            tool_names=["search_property", "summarize_options", "terminate"],
+                            tracer=tracer,
+                            # a tool cache of its own, or every size after the first would be
+                            # answered with the cached results of the same (seeded) criteria
+                            environment=Environment(tracer=tracer, tool_cache=InMemoryLRUCache()),
+                            planner=None)  # every turn goes through the scripted LLM
+
+        iterations = 0
+        start = time.perf_counter()
+        for criteria in make_criteria(sessions):
+            agent.generate_response = ScriptedResponses(make_script(criteria))
+            memory = agent.run("search for a property based on my criteria and provide a summary of the options")
+            iterations += (len(memory.get_memories()) - 1) // 2
+        total = time.perf_counter() - start
+
+    stages = {stage: tracer.stage_totals[stage][1] / iterations for stage in STAGES}
+    stages["total"] = total / iterations * 1000
+    stages["tools"] = {name: histogram.to_dict() for name, histogram in tracer.tool_latency.items()}
+    return stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 100000])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--baseline", help="compare against a results file written with --save-baseline")
+    parser.add_argument("--save-baseline", help="write the results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'rows':>8} " + " ".join(f"{stage:>14}" for stage in STAGES + ["total"]) + "   (ms per iteration)")
+    for size in args.sizes:
+        stages = results[str(size)] = run_size(size, args.sessions)
+        print(f"{size:>8} " + " ".join(f"{stages[stage]:>14.3f}" for stage in STAGES + ["total"]))
+        for tool, histogram in stages["tools"].items():
+            print(f"{'':>8} {tool}: p50 {histogram['p50_ms']:.2f} ms, p95 {histogram['p95_ms']:.2f} ms, "
+                  f"max {histogram['max_ms']:.2f} ms over {histogram['count']} calls")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=4)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = [
+            f"{size} rows / {stage}: {baseline[size][stage]:.3f} -> {stages[stage]:.3f} ms"
+            for size, stages in results.items() if size in baseline
+            for stage in STAGES + ["total"]
+            if baseline[size].get(stage) and stages[stage] > baseline[size][stage] * (1 + REGRESSION_THRESHOLD)
+        ]
+        print("\n".join(["regressions:"] + regressions) if regressions else "no regressions")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+LLM client benchmark against the local stub endpoint (benchmarks/llm_stub_server.py).
+
+Sends the same requests from many threads through one shared, pooled
+LLMClient and through a fresh client per request (a new connection each
+time, like isolated completion() calls), with every n-th request rate
+limited, and reports wall time, connections opened and retries.
+    python -m benchmarks.bench_llm_client --requests 200 --threads 16 --fail-every 10
+"""
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from module.game import Prompt
+from module.llm_client import LLMClient
+from benchmarks.llm_stub_server import StubLLMServer
+
+PROMPT = Prompt(messages=[{"role": "user", "content": "find me a house"}],
+                tools=[{"type": "function", "function": {"name": "terminate", "parameters": {"type": "object"}}}])
+
+
+def run(server: StubLLMServer, requests: int, threads: int, shared: bool) -> dict:
+    client_kwargs = {"api_base": server.api_base, "api_key": "stub", "max_in_flight": threads, "backoff_base": 0.01}
+    client = LLMClient(**client_kwargs) if shared else None
+    before = dict(server.counters)
+    retries = 0
+
+    def one(_):
+        nonlocal retries
+        own = client or LLMClient(**client_kwargs)
+        try:
+            return own(PROMPT)
+        finally:
+            if client is None:
+                retries += own.stats()["retries"]
+                own.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        responses = list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    if client is not None:
+        retries = client.stats()["retries"]
+        client.close()
+    assert all(response for response in responses)
+    return {
+        "seconds": elapsed,
+        "connections": server.counters["connections"] - before["connections"],
+        "rate_limited": server.counters["rate_limited"] - before["rate_limited"],
+        "retries": retries,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--fail-every", type=int, default=10)
+    args = parser.parse_args()
+
+    server = StubLLMServer(latency=args.latency, fail_every=args.fail_every).start()
+    try:
+        for name, shared in [("client per request", False), ("shared pooled client", True)]:
+            result = run(server, args.requests, args.threads, shared)
+            print(f"{name:>22}: {result['seconds']:.2f} s, {result['connections']} connections, "
+                  f"{result['rate_limited']} rate limited, {result['retries']} retries")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compare the search_property backends on synthetic listings.
+
+Run from the repository root:
+    python -m benchmarks.bench_property_search --rows 1000000 --queries 20
+    python -m benchmarks.bench_property_search --backends indexed snapshot
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+from benchmarks.synthetic import make_properties, make_criteria
+from module.property_store import matches_criteria, get_store_class
+
+
+def row_by_row_search(properties, criteria, partial_search):
+    """The original search_property path: one python predicate per record"""
+    return [prop for prop in properties if matches_criteria(prop, criteria, partial_search)]
+
+
+def time_queries(search, queries, partial_search):
+    start = time.perf_counter()
+    for criteria in queries:
+        search(criteria, partial_search)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def compare(backends, properties, queries):
+    # sanity check: every backend must return the same rows as the row-by-row path
+    for name, search in backends.items():
+        for partial_search in (False, True):
+            assert search(queries[0], partial_search) == row_by_row_search(properties, queries[0], partial_search), name
+
+    print(f"{'backend':<12} {'exact ms/query':>15} {'partial ms/query':>17}")
+    baseline = None
+    for name, search in backends.items():
+        exact = time_queries(search, queries, False)
+        partial = time_queries(search, queries, True)
+        baseline = baseline or exact
+        print(f"{name:<12} {exact * 1000:>15.2f} {partial * 1000:>17.2f}   ({baseline / exact:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--backends", nargs="+", default=["indexed", "columnar"],
+                        choices=["indexed", "columnar", "stream", "snapshot"],
+                        help="stream and snapshot read a temporary JSON file of the listings")
+    args = parser.parse_args()
+
+    print(f"generating {args.rows:,} listings...")
+    properties = make_properties(args.rows)
+    queries = make_criteria(args.queries)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {"row-by-row": lambda criteria, partial: row_by_row_search(properties, criteria, partial)}
+        data_path = None
+        for name in args.backends:
+            store_class = get_store_class(name)
+            if not hasattr(store_class, "from_records") and data_path is None:
+                # file-backed stores get the same listings through a file
+                data_path = os.path.join(tmp, "properties.json")
+                with open(data_path, "w") as f:
+                    json.dump(properties, f)
+            start = time.perf_counter()
+            if hasattr(store_class, "from_records"):
+                store = store_class.from_records(properties)
+            else:
+                store = store_class(data_path)
+                store.search({}, False, 1)  # the first load (e.g. building the snapshot) counts as build time
+            print(f"{name}: build {time.perf_counter() - start:.2f}s")
+            backends[name] = store.search
+        compare(backends, properties, queries)
+
+
+if __name__ == "__main__":
+    main()
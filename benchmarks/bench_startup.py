@@ -0,0 +1,60 @@
+"""
+Cold startup benchmark of the property search agent.
+
+Starts a fresh interpreter per run that imports property_search_agent and
+builds the agent (without calling the LLM), and reports the wall time and the
+heaviest imports. Exits with status 1 when the median exceeds the target.
+Run from the repository root:
+    python -m benchmarks.bench_startup --runs 10 --target-ms 300
+"""
+import re
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+STARTUP_CODE = "import property_search_agent; property_search_agent.build_agent()"
+# cold start budget for the one-shot script, litellm alone used to take several seconds
+TARGET_MS = 300
+
+
+def time_startup() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", STARTUP_CODE], check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def heaviest_imports(top: int = 5) -> list:
+    """(cumulative ms, module) of the slowest top-level imports, from -X importtime"""
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", STARTUP_CODE],
+                            capture_output=True, text=True, check=True).stderr
+    imports = []
+    for line in output.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \| ( *)(\S+)", line)
+        if match and not match.group(2):
+            imports.append((int(match.group(1)) / 1000, match.group(3)))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--target-ms", type=float, default=TARGET_MS)
+    args = parser.parse_args()
+
+    time_startup()  # warm the OS file cache and __pycache__, "cold" means a fresh interpreter
+    timings = [time_startup() for _ in range(args.runs)]
+    median = statistics.median(timings)
+    print(f"startup over {args.runs} runs: median {median:.0f} ms, min {min(timings):.0f} ms, "
+          f"max {max(timings):.0f} ms (target {args.target_ms:.0f} ms)")
+    for ms, module in heaviest_imports():
+        print(f"{ms:>10.1f} ms  {module}")
+    if median > args.target_ms:
+        print("over target")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
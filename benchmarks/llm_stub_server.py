@@ -0,0 +1,157 @@
+"""
+Local stand-in for an OpenAI-compatible chat completions endpoint.
+
+Answers POST /v1/chat/completions (plain and stream=true) after a fixed
+latency, with a terminate tool call when the request offers that tool and a
+short text otherwise, streams end with a usage chunk when the request asks
+for one (stream_options.include_usage). fail_every=n answers every n-th request with a 429
+(with retry_after as its Retry-After), to exercise retries; cut_streams ends
+streamed answers after their first chunk without finishing them. Counts
+requests, the TCP connections clients opened and the most requests answered
+at once.
+    python -m benchmarks.llm_stub_server --port 8765 --latency 0.05
+"""
+import json
+import time
+import argparse
+import threading
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+def stub_message(body: dict) -> dict:
+    tools = [tool["function"]["name"] for tool in body.get("tools") or []]
+    if "terminate" in tools:
+        arguments = json.dumps({"message": "Here is a summary of the matching properties."})
+        return {"role": "assistant", "content": None, "tool_calls": [
+            {"id": "call_0", "type": "function", "function": {"name": "terminate", "arguments": arguments}}]}
+    return {"role": "assistant", "content": "Stub reply."}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients can reuse connections
+
+    def setup(self):
+        super().setup()
+        self.server.count("connections")
+
+    def log_message(self, format, *args):
+        pass
+
+    def _json(self, status: int, body: dict, headers: dict = None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._json(404, {"error": {"message": f"unknown path {self.path}"}})
+        number = self.server.count("requests")
+        if self.server.fail_every and number % self.server.fail_every == 0:
+            self.server.count("rate_limited")
+            return self._json(429, {"error": {"message": "rate limited"}},
+                              {"Retry-After": f"{self.server.retry_after:g}"})
+        with self.server.answering():
+            time.sleep(self.server.latency)
+        message = stub_message(body)
+        usage = {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120}
+        if not body.get("stream"):
+            return self._json(200, {"id": f"stub-{number}", "object": "chat.completion", "model": body.get("model"),
+                                    "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+                                    "usage": usage})
+        self._stream(message, usage if (body.get("stream_options") or {}).get("include_usage") else None)
+
+    def _stream(self, message: dict, usage: dict = None):
+        deltas = []
+        if message.get("tool_calls"):
+            call = message["tool_calls"][0]
+            arguments = call["function"]["arguments"]
+            deltas.append({"tool_calls": [{"index": 0, "id": call["id"], "type": "function",
+                                           "function": {"name": call["function"]["name"], "arguments": ""}}]})
+            deltas += [{"tool_calls": [{"index": 0, "function": {"arguments": arguments[i:i + 8]}}]}
+                       for i in range(0, len(arguments), 8)]
+        else:
+            deltas += [{"content": message["content"][i:i + 4]} for i in range(0, len(message["content"]), 4)]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for delta in deltas:
+            self._chunk(f"data: {json.dumps({'choices': [{'index': 0, 'delta': delta}]})}\n\n")
+            if self.server.cut_streams:
+                self.close_connection = True
+                return
+        if usage is not None:
+            self._chunk(f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n")
+        self._chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _chunk(self, text: str):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    """Run with start() / shutdown(); api_base is what to give LLMClient"""
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0.05, fail_every: int = 0, retry_after: float = 0,
+                 cut_streams: bool = False):
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.latency = latency
+        self.fail_every = fail_every
+        self.retry_after = retry_after
+        self.cut_streams = cut_streams
+        self.counters = {"requests": 0, "connections": 0, "rate_limited": 0, "max_concurrent": 0}
+        self._concurrent = 0
+        self._lock = threading.Lock()
+
+    @property
+    def api_base(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def count(self, name: str) -> int:
+        with self._lock:
+            self.counters[name] += 1
+            return self.counters[name]
+
+    @contextmanager
+    def answering(self):
+        """Held while a request is being answered, tracks the most answered at once"""
+        with self._lock:
+            self._concurrent += 1
+            self.counters["max_concurrent"] = max(self.counters["max_concurrent"], self._concurrent)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._concurrent -= 1
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--fail-every", type=int, default=0)
+    parser.add_argument("--retry-after", type=float, default=0)
+    args = parser.parse_args()
+    server = StubLLMServer(args.port, args.latency, args.fail_every, args.retry_after)
+    print(f"stub LLM listening on {server.api_base}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
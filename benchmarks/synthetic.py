@@ -0,0 +1,52 @@
+import random
+from typing import List
+
+# =============================================
+# Synthetic property listings for benchmarks
+# =============================================
+LOCATIONS = ["Sloan Lake, Denver", "Highlands, Denver", "Capitol Hill, Denver", "Washington Park, Denver",
+             "Cherry Creek, Denver", "Five Points, Denver", "Baker, Denver", "Park Hill, Denver"]
+ROOFING = ["Clay Tile", "Asphalt Shingle", "Metal", "Slate", "Wood Shake"]
+SIDING = ["Brick", "Fiber Cement", "Stucco", "Vinyl", "Wood"]
+HEATING = ["Heat Pump", "Forced Air", "Radiant", "Baseboard", "None"]
+COOLING = ["Central Air", "Evaporative", "Mini Split", "None"]
+STREETS = ["Magic Drive", "Elm Street", "Pearl Avenue", "Tennyson Street", "Colfax Avenue", "Lowell Blvd"]
+
+
+def make_properties(n: int, seed: int = 0) -> List[dict]:
+    """Generate n listings shaped like data/property_data.json"""
+    rng = random.Random(seed)
+    properties = []
+    for i in range(n):
+        has_hoa = rng.random() < 0.4
+        price = rng.randrange(250_000, 2_000_000, 5_000)
+        properties.append({
+            "address": f"{i} {rng.choice(STREETS)}",
+            "location": rng.choice(LOCATIONS),
+            "num_of_bedrooms": rng.randint(1, 6),
+            "num_of_bathrooms": rng.randint(1, 4),
+            "has_garage": rng.random() < 0.6,
+            "year_built": rng.randint(1900, 2024),
+            "price": price,
+            "roofing_material": rng.choice(ROOFING),
+            "siding_material": rng.choice(SIDING),
+            "heating": rng.choice(HEATING),
+            "cooling": rng.choice(COOLING),
+            "has_hoa": has_hoa,
+            "hoa_fee": round(rng.uniform(50, 600), 2) if has_hoa else 0,
+            "last_sold_date": f"{rng.randint(1990, 2023)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "last_sold_price": int(price * rng.uniform(0.6, 1.0)),
+        })
+    return properties
+
+
+def make_criteria(n: int, seed: int = 1) -> List[dict]:
+    """Generate n search criteria in the shape returned by get_search_criteria"""
+    rng = random.Random(seed)
+    return [{
+        "location": rng.choice(LOCATIONS),
+        "num_of_bedrooms": rng.randint(1, 6),
+        "num_of_bathrooms": rng.randint(1, 4),
+        "has_garage": rng.random() < 0.5,
+        "year_built": rng.randint(1900, 2020),
+    } for _ in range(n)]
@@ -1,27 +1,55 @@
-from module.register_tools import *
+import json
+import time
 from module.game import *
 from module.agent_language import *
-from typing import Callable
+from module.memory import estimate_tokens
+from module.tracing import NULL_TRACER
+from module.agent_logging import get_logger, Truncated
+import asyncio
+import inspect
+from typing import Callable, Optional
+
+logger = get_logger("agent")
+
 class Agent:
     def __init__(self,
                  goals: list[Goal],
                  agent_language: AgentLanguage,
                  action_registry: ActionRegistry,
                  generate_response: Callable[[Prompt], str],
-                 environment: Environment):
+                 environment: Environment,
+                 tracer=None,
+                 tool_selector=None,
+                 on_text: Callable[[str], None] = None,
+                 model_router=None,
+                 planner=None):
         """
         Initialize an agent with its core GAME components
+        tracer (module.tracing.Tracer) records a span per stage of the loop, tracing is off by default
+        tool_selector (module.tool_selection.ToolSelector) narrows the tools offered per turn, all are offered by default
+        on_text receives the final message as it is generated, when generate_response can stream (see module.llm_stream)
+        model_router (module.model_router.ModelRouter) picks the model per turn, DEFAULT_MODEL is used by default
+        planner (module.planner.FastPathPlanner) is asked for the next step before the LLM, the LLM always decides by default
         """
         self.goals = goals
         self.generate_response = generate_response
         self.agent_language = agent_language
         self.actions = action_registry
         self.environment = environment
+        self.tracer = tracer or NULL_TRACER
+        self.tool_selector = tool_selector
+        self.on_text = on_text
+        self.model_router = model_router
+        self.planner = planner
 
     def construct_prompt(self, goals: list[Goal], memory: Memory, actions: ActionRegistry) -> Prompt:
         """Build prompt with memory context"""
+        if self.tool_selector is not None:
+            offered = self.tool_selector.select(actions, goals, memory)
+        else:
+            offered = actions.get_actions()
         return self.agent_language.construct_prompt(
-            actions=actions.get_actions(),
+            actions=offered,
             environment=self.environment,
             goals=goals,
             memory=memory
@@ -33,17 +61,22 @@ class Agent:
         action = self.actions.get_action(invocation["tool"])
         return action, invocation
 
+    def get_actions(self, response) -> list:
+        """get every (action, invocation) the agent asked for in this turn"""
+        return [(self.actions.get_action(invocation["tool"]), invocation)
+                for invocation in self.agent_language.parse_response_batch(response)]
+
     def should_terminate(self, response: str) -> bool:
-        """terminate the loop"""
-        action_def, _ = self.get_action(response)
-        return action_def.terminal
+        """terminate the loop if any of the turn's actions is terminal"""
+        return any(action_def.terminal for action_def, _ in self.get_actions(response))
 
     def set_current_task(self, memory: Memory, task: str):
         memory.add_memory({"type": "user", "content": task})
     
-    def update_memory(self, memory: Memory, response: str, result: dict):
+    def update_memory(self, memory: Memory, response: str, result):
         """
         Update memory with the agent's decision and the environment's response.
+        result is a single result dict, or a list of them when the turn made several tool calls.
         """
         new_memories = [
             {"type": "assistant", "content": response},
@@ -53,39 +86,184 @@ class Agent:
             memory.add_memory(m)
     
 
+    def count_prompt_tokens(self, prompt: Prompt) -> int:
+        """Approximate size of a prompt, messages plus tool schemas"""
+        # the tool list is usually the same (cached) object turn after turn
+        tools_key, tool_tokens = getattr(self, "_tool_tokens", (None, 0))
+        if tools_key is not prompt.tools:
+            tools_json = prompt.metadata.get("tools_json") or json.dumps(prompt.tools)
+            tool_tokens = estimate_tokens(tools_json)
+            self._tool_tokens = (prompt.tools, tool_tokens)
+        return sum(estimate_tokens(message.get("content") or "") for message in prompt.messages) + tool_tokens
+
+    def route_model(self, prompt: Prompt, memory: Memory) -> tuple:
+        """Pick this turn's model and set it on the prompt; returns (route, prompt tokens), (None, 0) without a router"""
+        if self.model_router is None:
+            return None, 0
+        prompt_tokens = self.count_prompt_tokens(prompt)
+        route = self.model_router.select(self.goals, memory, prompt_tokens)
+        self.model_router.apply(prompt, route)
+        return route, prompt_tokens
+
+    def plan_action(self, memory: Memory, iteration: int = 0) -> Optional[str]:
+        """The planner's next step as a response (same encoding as the LLM's), None to ask the LLM"""
+        if self.planner is None:
+            return None
+        with self.tracer.span("plan", iteration=iteration) as span:
+            invocation = self.planner.plan(memory, self.actions)
+            span.set(fast_path=invocation is not None)
+        if invocation is None:
+            return None
+        logger.debug("Fast path: %s, skipping the LLM", invocation["tool"])
+        return json.dumps(invocation)
+
     def prompt_llm_for_action(self, full_prompt: Prompt) -> str:
         response = self.generate_response(full_prompt)
         return response
 
+    def stream_llm_for_action(self, full_prompt: Prompt) -> tuple:
+        """
+        Stream the LLM's turn and start executing each tool call as soon as its arguments are complete.
+        Returns the response and {position in the turn: (action, future)} of the calls started early.
+        """
+        started = {}
+
+        def on_tool_call(position: int, invocation: dict):
+            action = self.actions.get_action(invocation["tool"])
+            if action is not None:
+                started[position] = (action, self.environment.submit_action(action, invocation["args"]))
+
+        response = self.generate_response.stream(full_prompt, on_tool_call=on_tool_call, on_text=self.on_text)
+        return response, started
+
+    def collect_results(self, calls: list, started: dict) -> list:
+        """Results of the turn's calls, waiting on the ones started while streaming and running the rest"""
+        results = []
+        for position, (action, args) in enumerate(calls):
+            early = started.get(position)
+            if early is not None and early[0] is action:
+                results.append(early[1].result())
+            else:
+                results.append(self.environment.execute_action(action, args))
+        return results
+
+    async def aprompt_llm_for_action(self, full_prompt: Prompt) -> str:
+        """Async generate_response functions are awaited, blocking ones run in a worker thread"""
+        if inspect.iscoroutinefunction(self.generate_response):
+            return await self.generate_response(full_prompt)
+        return await asyncio.to_thread(self.generate_response, full_prompt)
+
     def run(self, user_input: str, memory=None, max_iterations: int = 50) -> Memory:
         """
         Execute the GAME loop for this agent with a maximum iteration limit.
         """
         memory = memory or Memory()
         self.set_current_task(memory, user_input)
+        with self.tracer.span("agent.run", max_iterations=max_iterations):
+            return self._run_loop(memory, max_iterations)
+
+    def _run_loop(self, memory: Memory, max_iterations: int) -> Memory:
+        tracer = self.tracer
+        streaming = hasattr(self.generate_response, "stream")
+        for iteration in range(max_iterations):
+            logger.debug("--------------")
+            # Ask the planner first, a deterministic next step needs no LLM round trip
+            response = self.plan_action(memory, iteration)
+            started = None
+            if response is None:
+                # Construct a prompt that includes the Goals, Actions, and the current Memory
+                with tracer.span("prompt_build", iteration=iteration) as span:
+                    prompt = self.construct_prompt(self.goals, memory, self.actions)
+                    if tracer.enabled:
+                        span.set(messages=len(prompt.messages), tools=len(prompt.tools),
+                                 prompt_tokens=self.count_prompt_tokens(prompt))
+                    route, prompt_tokens = self.route_model(prompt, memory)
+
+                logger.debug("Agent thinking... (iteration %d)", iteration)
+                # Generate a response from the agent, tool calls start running as they stream in
+                with tracer.span("llm", iteration=iteration, model=prompt.metadata.get("model", DEFAULT_MODEL)):
+                    llm_start = time.perf_counter()
+                    if streaming:
+                        response, started = self.stream_llm_for_action(prompt)
+                    else:
+                        response = self.prompt_llm_for_action(prompt)
+                    if route is not None:
+                        self.model_router.record(route, time.perf_counter() - llm_start, prompt_tokens, response)
+            logger.info("Agent Decision: %s", Truncated(response))
+
+            # Determine which actions the agent wants to execute
+            with tracer.span("parse", iteration=iteration):
+                calls = [(action, invocation["args"]) for action, invocation in self.get_actions(response)]
+
+            # Execute the actions in the environment, concurrently when there are several
+            with tracer.span("tool_execution", iteration=iteration, tools=len(calls)):
+                if started is not None:
+                    results = self.collect_results(calls, started)
+                else:
+                    results = self.environment.execute_actions(calls)
+            result = results[0] if len(results) == 1 else results
+            logger.info("Action Result: %s", Truncated(result))
+
+            # Update the agent's memory with information about what happened
+            with tracer.span("memory_update", iteration=iteration):
+                self.update_memory(memory, response, result)
+
+            # Check if the agent has decided to terminate
+            if self.should_terminate(response):
+                break
+
+        return memory
+
+    async def arun(self, user_input: str, memory=None, max_iterations: int = 50) -> Memory:
+        """
+        Execute the GAME loop as a coroutine, so one event loop can drive many sessions.
+        Pass an async generate_response (e.g. agenerate_response) to avoid tying up threads.
+        """
+        memory = memory or Memory()
+        self.set_current_task(memory, user_input)
+        with self.tracer.span("agent.run", max_iterations=max_iterations):
+            return await self._arun_loop(memory, max_iterations)
 
-        for _ in range(max_iterations):
-            print("--------------")
-            # Construct a prompt that includes the Goals, Actions, and the current Memory
-            prompt = self.construct_prompt(self.goals, memory, self.actions)
+    async def _arun_loop(self, memory: Memory, max_iterations: int) -> Memory:
+        tracer = self.tracer
+        for iteration in range(max_iterations):
+            logger.debug("--------------")
+            # Ask the planner first, a deterministic next step needs no LLM round trip
+            response = self.plan_action(memory, iteration)
+            if response is None:
+                # Construct a prompt that includes the Goals, Actions, and the current Memory
+                with tracer.span("prompt_build", iteration=iteration) as span:
+                    prompt = self.construct_prompt(self.goals, memory, self.actions)
+                    if tracer.enabled:
+                        span.set(messages=len(prompt.messages), tools=len(prompt.tools),
+                                 prompt_tokens=self.count_prompt_tokens(prompt))
+                    route, prompt_tokens = self.route_model(prompt, memory)
 
-            print("Agent thinking...")
-            # Generate a response from the agent
-            response = self.prompt_llm_for_action(prompt)
-            print(f"Agent Decision: {response}")
+                logger.debug("Agent thinking... (iteration %d)", iteration)
+                # Generate a response from the agent without blocking other sessions
+                with tracer.span("llm", iteration=iteration, model=prompt.metadata.get("model", DEFAULT_MODEL)):
+                    llm_start = time.perf_counter()
+                    response = await self.aprompt_llm_for_action(prompt)
+                    if route is not None:
+                        self.model_router.record(route, time.perf_counter() - llm_start, prompt_tokens, response)
+            logger.info("Agent Decision: %s", Truncated(response))
 
-            # Determine which action the agent wants to execute
-            action, invocation = self.get_action(response)
+            # Determine which actions the agent wants to execute
+            with tracer.span("parse", iteration=iteration):
+                calls = [(action, invocation["args"]) for action, invocation in self.get_actions(response)]
 
-            # Execute the action in the environment
-            result = self.environment.execute_action(action, invocation["args"])
-            print(f"Action Result: {result}")
+            # Execute the actions in the environment, concurrently when there are several
+            with tracer.span("tool_execution", iteration=iteration, tools=len(calls)):
+                results = await self.environment.aexecute_actions(calls)
+            result = results[0] if len(results) == 1 else results
+            logger.info("Action Result: %s", Truncated(result))
 
             # Update the agent's memory with information about what happened
-            self.update_memory(memory, response, result)
+            with tracer.span("memory_update", iteration=iteration):
+                self.update_memory(memory, response, result)
 
             # Check if the agent has decided to terminate
             if self.should_terminate(response):
                 break
 
-        return memory
\ No newline at end of file
+        return memory
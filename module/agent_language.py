@@ -1,6 +1,8 @@
+import weakref
 from typing import Any
-from module.register_tools import *
+import json
 from module.game import *
+from module.tool_schema import tools_json, tools_digest
 class AgentLanguage:
     def __init__(self):
         pass
@@ -16,12 +18,20 @@ class AgentLanguage:
     def parse_response(self, response: str) -> dict:
         raise NotImplementedError("Subclasses must implement this method")
 
+    def parse_response_batch(self, response: str) -> list[dict]:
+        """Parse a response that may hold several tool invocations"""
+        return [self.parse_response(response)]
+
 
 
 class AgentFunctionCallingActionLanguage(AgentLanguage):
 
     def __init__(self):
         super().__init__()
+        # prompt pieces reused across iterations (see construct_prompt)
+        self._goals_cache = (None, None)
+        self._tools_cache = {}  # tuple of tool schemas -> (tools, metadata), one per tool selection
+        self._memory_cache = weakref.WeakKeyDictionary()
 
     def format_goals(self, goals: list[Goal]) -> list:
         # Map all goals to a single string that concatenates their description
@@ -38,38 +48,25 @@ class AgentFunctionCallingActionLanguage(AgentLanguage):
         # Map all assistant messages to a role:assistant messages
         # Map all user messages to a role:user messages
         items = memory.get_memories()
-        mapped_items = []
-        for item in items:
-
-            content = item.get("content", None)
-            if not content:
-                content = json.dumps(item, indent=4)
+        return [self.format_memory_item(item) for item in items]
 
-            if item["type"] == "assistant":
-                mapped_items.append({"role": "assistant", "content": content})
-            elif item["type"] == "environment":
-                mapped_items.append({"role": "assistant", "content": content})
-            else:
-                mapped_items.append({"role": "user", "content": content})
+    def format_memory_item(self, item: dict) -> dict:
+        """Map a single memory item to a chat message"""
+        content = item.get("content", None)
+        if not content:
+            content = json.dumps(item, indent=4)
 
-        return mapped_items
+        if item["type"] == "assistant":
+            return {"role": "assistant", "content": content}
+        elif item["type"] == "environment":
+            return {"role": "assistant", "content": content}
+        else:
+            return {"role": "user", "content": content}
 
     def format_actions(self, actions: list[Action]) -> [list,list]:
         """Generate response from language model"""
-
-        tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": action.name,
-                    # Include up to 1024 characters of the description
-                    "description": action.description[:1024],
-                    "parameters": action.parameters,
-                },
-            } for action in actions
-        ]
-
-        return tools
+        # the tool dicts are compiled once per tool (see module.tool_schema), not per prompt
+        return [action.schema.openai_tool for action in actions]
 
     def construct_prompt(self,
                          actions: list[Action],
@@ -77,13 +74,51 @@ class AgentFunctionCallingActionLanguage(AgentLanguage):
                          goals: list[Goal],
                          memory: Memory) -> Prompt:
 
+        """
+        Build the prompt incrementally: goals and tools are formatted once and reused
+        while they stay the same, and only memory items added since the last call are
+        formatted. Memory that was rewritten (its revision changed, e.g. compacted) is
+        formatted again from scratch.
+        """
         prompt = []
-        prompt += self.format_goals(goals)
-        prompt += self.format_memory(memory)
-
-        tools = self.format_actions(actions)
-
-        return Prompt(messages=prompt, tools=tools)
+        prompt += self._cached_goals(goals)
+        prompt += self._cached_memory(memory)
+
+        tools, tools_metadata = self._cached_tools(actions)
+
+        return Prompt(messages=prompt, tools=tools, metadata=dict(tools_metadata))
+
+    def _cached_goals(self, goals: list[Goal]) -> list:
+        key = tuple(goals)
+        cached_key, messages = self._goals_cache
+        if cached_key != key:
+            messages = self.format_goals(goals)
+            self._goals_cache = (key, messages)
+        return messages
+
+    def _cached_tools(self, actions: list[Action]) -> tuple:
+        schemas = tuple(action.schema for action in actions)
+        cached = self._tools_cache.get(schemas)
+        if cached is None:
+            if len(self._tools_cache) >= 64:
+                self._tools_cache.clear()
+            # the precomputed JSON lets caches and token counts skip serializing the tools
+            cached = (self.format_actions(actions),
+                      {"tools_json": tools_json(schemas), "tools_digest": tools_digest(schemas)})
+            self._tools_cache[schemas] = cached
+        return cached
+
+    def _cached_memory(self, memory: Memory) -> list:
+        items = memory.get_memories()
+        revision = getattr(memory, "revision", 0)
+        cached = self._memory_cache.get(memory)
+        if cached is None or cached[0] != revision or len(cached[1]) > len(items):
+            cached = self._memory_cache[memory] = (revision, [])
+        messages = cached[1]
+        # only format what was appended since the last prompt
+        for item in items[len(messages):]:
+            messages.append(self.format_memory_item(item))
+        return messages
 
     def adapt_prompt_after_parsing_error(self,
                                          prompt: Prompt,
@@ -97,11 +132,18 @@ class AgentFunctionCallingActionLanguage(AgentLanguage):
     def parse_response(self, response: str) -> dict:
         """Parse LLM response into structured format by extracting the ```json block"""
 
+        invocations = self.parse_response_batch(response)
+        return invocations[0]
+
+    def parse_response_batch(self, response: str) -> list[dict]:
+        """Parse LLM response into a list of invocations (one per tool call of the turn)"""
+
         try:
-            return json.loads(response)
+            invocations = json.loads(response)
+            return invocations if isinstance(invocations, list) else [invocations]
 
         except Exception as e:
-            return {
+            return [{
                 "tool": "terminate",
                 "args": {"message":response}
-            }
\ No newline at end of file
+            }]
\ No newline at end of file
@@ -0,0 +1,137 @@
+import sys
+import queue
+import logging
+import reprlib
+import threading
+import module.config as config
+
+# =============================================
+# Logging for the agent loop
+# =============================================
+# The loop logs through the "agentic" logger hierarchy instead of print().
+# Payloads (agent decisions, tool args and results) are wrapped in Truncated,
+# which is only rendered if the record passes the level filter and never
+# renders more than max_payload_chars. configure_logging() can hand records
+# to a background thread that writes them to the stream in batches, so the
+# loop never blocks on stdout.
+ROOT_LOGGER = "agentic"
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+class Truncated:
+    """Lazy, size-bounded rendering of a log payload"""
+    max_chars = config.LOG_MAX_PAYLOAD_CHARS
+    # limit -> Repr, never changed once built: payloads are rendered from many threads at once
+    _reprs = {}
+
+    def __init__(self, value, max_chars: int = None):
+        self.value = value
+        self.limit = max_chars or Truncated.max_chars
+
+    @classmethod
+    def _repr_for(cls, limit: int) -> reprlib.Repr:
+        repr_ = cls._reprs.get(limit)
+        if repr_ is None:
+            repr_ = reprlib.Repr()
+            repr_.maxlevel = 4
+            repr_.maxdict = repr_.maxlist = repr_.maxtuple = repr_.maxset = 10
+            repr_.maxother = 200
+            repr_.maxstring = limit
+            repr_ = cls._reprs.setdefault(limit, repr_)
+        return repr_
+
+    def __str__(self):
+        value = self.value
+        if isinstance(value, str):
+            text = value
+        else:
+            # reprlib stops early on big containers, so cost is bounded by the limit
+            text = self._repr_for(self.limit).repr(value)
+        if len(text) > self.limit:
+            return f"{text[:self.limit]}... [{len(text) - self.limit}+ chars truncated]"
+        return text
+
+
+class AsyncBatchingHandler(logging.Handler):
+    """
+    Hands records to a background thread that writes them to a stream in batches.
+    emit() never blocks: when the queue is full the record is dropped and counted.
+    """
+    def __init__(self, stream=None, batch_size: int = 200, flush_interval: float = 0.2, max_queue: int = 10000):
+        super().__init__()
+        self.stream = stream or sys.stdout
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._worker, name="agentic-log", daemon=True)
+        self._thread.start()
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            # render in the caller's thread, the payload may change once the loop moves on
+            line = self.format(record)
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def _worker(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                lines = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(lines) < self.batch_size:
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+            except Exception:
+                pass
+
+    def flush(self):
+        """Wait until everything queued so far has been written"""
+        while not self._queue.empty() and self._thread.is_alive():
+            self._stopping.wait(0.01)
+
+    def close(self):
+        self._stopping.set()
+        self._thread.join(timeout=5)
+        super().close()
+
+
+def configure_logging(level: str = None,
+                      max_payload_chars: int = None,
+                      asynchronous: bool = None,
+                      stream=None,
+                      fmt: str = LOG_FORMAT) -> logging.Logger:
+    """
+    Set up the "agentic" logger. Arguments default to the LOG_* settings in module.config.
+    Calling it again replaces the previous handler.
+    """
+    level = level or config.LOG_LEVEL
+    asynchronous = config.LOG_ASYNC if asynchronous is None else asynchronous
+    if max_payload_chars:
+        Truncated.max_chars = max_payload_chars
+
+    logger = logging.getLogger(ROOT_LOGGER)
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+    handler = AsyncBatchingHandler(stream) if asynchronous else logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(logging.Formatter(fmt))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
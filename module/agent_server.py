@@ -0,0 +1,202 @@
+import json
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Callable, Dict
+from module.game import Memory
+import module.config as config
+from module.agent_logging import get_logger
+
+logger = get_logger("server")
+
+# =============================================
+# Long-running multi-session agent server
+# =============================================
+# One process keeps registries, datasets and schemas loaded and hosts many
+# sessions. Each session has its own Memory; turns run on a bounded worker
+# pool and turns of the same session never overlap.
+#
+#   POST   /sessions                 -> {"session_id": ...}
+#   POST   /sessions/<id>/messages   {"input": "...", "max_iterations": 10} -> {"result": ..., ...}
+#   GET    /sessions/<id>            -> the session's memory
+#   DELETE /sessions/<id>
+#   GET    /health                   -> session count, worker count, cache stats
+
+
+class SessionNotFound(KeyError):
+    pass
+
+
+class Session:
+    def __init__(self, session_id: str, agent, memory: Memory):
+        self.session_id = session_id
+        self.agent = agent
+        self.memory = memory
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+
+class SessionManager:
+    """
+    Hosts agent sessions and schedules their turns on a worker pool.
+
+    agent_factory builds the Agent of a new session; it should reuse shared,
+    already-loaded components (registry, environment) so a session is cheap.
+    """
+    def __init__(self,
+                 agent_factory: Callable[[], object],
+                 memory_factory: Callable[[], Memory] = Memory,
+                 max_workers: int = None,
+                 session_ttl: float = None,
+                 max_iterations: int = 10):
+        self.agent_factory = agent_factory
+        self.memory_factory = memory_factory
+        self.max_workers = max_workers or config.SERVER_WORKERS
+        self.session_ttl = session_ttl or config.SERVER_SESSION_TTL
+        self.max_iterations = max_iterations
+        self.sessions: Dict[str, Session] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="session")
+
+    def create_session(self) -> str:
+        self.expire_sessions()
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self.sessions[session_id] = Session(session_id, self.agent_factory(), self.memory_factory())
+        logger.info("Created session %s", session_id)
+        return session_id
+
+    def get_session(self, session_id: str) -> Session:
+        with self._lock:
+            session = self.sessions.get(session_id)
+        if session is None:
+            raise SessionNotFound(session_id)
+        return session
+
+    def close_session(self, session_id: str):
+        with self._lock:
+            if self.sessions.pop(session_id, None) is None:
+                raise SessionNotFound(session_id)
+
+    def expire_sessions(self):
+        """Drop sessions idle for longer than session_ttl"""
+        cutoff = time.monotonic() - self.session_ttl
+        with self._lock:
+            expired = [sid for sid, session in self.sessions.items()
+                       if session.last_used < cutoff and not session.lock.locked()]
+            for sid in expired:
+                del self.sessions[sid]
+        if expired:
+            logger.info("Expired %d idle sessions", len(expired))
+
+    def _run_turn(self, session: Session, user_input: str, max_iterations: int) -> dict:
+        with session.lock:
+            session.last_used = time.monotonic()
+            start = len(session.memory.get_memories())
+            session.agent.run(user_input, memory=session.memory, max_iterations=max_iterations)
+            session.last_used = time.monotonic()
+            new_items = session.memory.get_memories()[start:]
+        return {
+            "session_id": session.session_id,
+            "result": last_tool_result(new_items),
+            "memory_items": len(session.memory.get_memories()),
+        }
+
+    def submit(self, session_id: str, user_input: str, max_iterations: int = None):
+        """Schedule a turn of a session on the worker pool, returns a Future of its reply"""
+        session = self.get_session(session_id)
+        return self._pool.submit(self._run_turn, session, user_input, max_iterations or self.max_iterations)
+
+    def stats(self) -> dict:
+        with self._lock:
+            sessions = len(self.sessions)
+            busy = sum(1 for session in self.sessions.values() if session.lock.locked())
+        return {"sessions": sessions, "busy_sessions": busy, "workers": self.max_workers}
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+def last_tool_result(items: list):
+    """The result of the last tool executed in a turn (e.g. the terminate message)"""
+    for item in reversed(items):
+        try:
+            content = json.loads(item.get("content") or "")
+        except ValueError:
+            continue
+        if isinstance(content, list):
+            content = content[-1] if content else None
+        if isinstance(content, dict) and "tool_executed" in content:
+            return content.get("result") if content.get("tool_executed") else content
+    return None
+
+
+class AgentRequestHandler(BaseHTTPRequestHandler):
+    """JSON over HTTP front end for a SessionManager (set as the server's .manager)"""
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, body: dict):
+        payload = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def _route(self):
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        manager = self.server.manager
+        try:
+            if self.command == "GET" and parts == ["health"]:
+                return self._send(200, {"status": "ok", **manager.stats(), **self.server.extra_stats()})
+            if parts[:1] == ["sessions"]:
+                if self.command == "POST" and len(parts) == 1:
+                    return self._send(201, {"session_id": manager.create_session()})
+                if self.command == "POST" and len(parts) == 3 and parts[2] == "messages":
+                    # only a bad body is the client's fault, errors raised during the turn are 500s
+                    try:
+                        body = self._read_json()
+                    except ValueError as e:
+                        return self._send(400, {"error": f"invalid JSON body: {e}"})
+                    if not isinstance(body, dict) or not isinstance(body.get("input"), str):
+                        return self._send(400, {"error": "body must contain an 'input' string"})
+                    max_iterations = body.get("max_iterations")
+                    if max_iterations is not None and (not isinstance(max_iterations, int)
+                                                       or isinstance(max_iterations, bool) or max_iterations < 1):
+                        return self._send(400, {"error": "'max_iterations' must be a positive integer"})
+                    future = manager.submit(parts[1], body["input"], max_iterations)
+                    return self._send(200, future.result())
+                if self.command == "GET" and len(parts) == 2:
+                    session = manager.get_session(parts[1])
+                    return self._send(200, {"session_id": parts[1], "memory": session.memory.get_memories()})
+                if self.command == "DELETE" and len(parts) == 2:
+                    manager.close_session(parts[1])
+                    return self._send(200, {"session_id": parts[1], "closed": True})
+            self._send(404, {"error": f"no route for {self.command} {self.path}"})
+        except SessionNotFound as e:
+            self._send(404, {"error": f"unknown session {e.args[0]}"})
+        except Exception as e:
+            logger.exception("Request %s %s failed", self.command, self.path)
+            self._send(500, {"error": str(e)})
+
+    do_GET = do_POST = do_DELETE = _route
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class AgentHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, manager: SessionManager, extra_stats: Callable[[], dict] = dict):
+        super().__init__(address, AgentRequestHandler)
+        self.manager = manager
+        self.extra_stats = extra_stats
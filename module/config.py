@@ -1,2 +1,54 @@
 TOOLS = {}
-TOOLS_BY_TAG = {}
\ No newline at end of file
+TOOLS_BY_TAG = {}
+
+# dataset searched by the search_property tool (JSON array or newline-delimited JSON)
+PROPERTY_DATA_PATH = "./data/property_data.json"
+# "indexed" (pure python indexes), "columnar" (numpy arrays, needs numpy installed)
+# "stream" (re-reads the file on every search, bounded memory for very large feeds)
+# or "snapshot" (memory-mapped binary snapshot, rebuilt when the JSON file is newer)
+PROPERTY_STORE_BACKEND = "indexed"
+# number of ranked properties a partial search returns when no limit is given
+PARTIAL_SEARCH_TOP_K = 10
+
+# logging of the agent loop (see module/agent_logging.py)
+LOG_LEVEL = "INFO"
+# agent decisions and tool results longer than this are truncated in the log
+LOG_MAX_PAYLOAD_CHARS = 500
+# write log records from a background thread in batches
+LOG_ASYNC = True
+
+# number of tool results kept for tools declared pure / with a cache_ttl
+TOOL_CACHE_SIZE = 256
+
+# worker threads shared by tools that run with isolation="thread" (or a timeout)
+TOOL_WORKERS = 16
+# how child processes are started for tools with isolation="process"
+TOOL_PROCESS_START_METHOD = "spawn"
+# seconds a tool's child process may take to start, not counted in the tool's timeout
+TOOL_PROCESS_START_TIMEOUT = 30
+
+# multi-session agent server (see module/agent_server.py)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8080
+# sessions whose turns run at the same time
+SERVER_WORKERS = 8
+# seconds an idle session is kept
+SERVER_SESSION_TTL = 3600
+
+# modules defining the agent's tools, they are only imported when one of their tools first runs
+TOOL_MODULES = ["module.property_tools", "module.result_tools"]
+
+# full results of paged / projected tools (see module/result_store.py), kept for fetch_more_results
+RESULT_STORE_SIZE = 256
+# seconds a stored result can still be fetched
+RESULT_STORE_TTL = 3600
+
+# shared LLM client (see module/llm_client.py), talks to an OpenAI-compatible endpoint
+LLM_API_BASE = "https://api.openai.com/v1"
+# requests sent at the same time by every agent sharing the client
+LLM_MAX_IN_FLIGHT = 8
+# tokens (prompt + completion) per minute, None for no limit
+LLM_TOKENS_PER_MINUTE = None
+# retries of rate-limited (429), overloaded (5xx) or dropped requests, with jittered backoff
+LLM_MAX_RETRIES = 4
+LLM_REQUEST_TIMEOUT = 60
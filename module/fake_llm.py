@@ -0,0 +1,148 @@
+import json
+import time
+import threading
+from types import SimpleNamespace
+from typing import Callable, List, Union
+from module.game import Prompt, DEFAULT_MODEL
+from module.llm_cache import prompt_key
+
+# =============================================
+# Offline stand-ins for generate_response
+# =============================================
+# A script step is one of:
+#   - a str, returned as is (plain text ends the run through the terminate fallback)
+#   - a {"tool": ..., "args": ...} dict, or a list of them for several tool calls in one turn
+#   - a callable taking the Prompt and returning one of the above
+ScriptStep = Union[str, dict, list, Callable[[Prompt], Union[str, dict, list]]]
+
+
+def last_tool_result(prompt: Prompt):
+    """The "result" of the most recent tool execution in the prompt, for callable script steps"""
+    for message in reversed(prompt.messages):
+        if message["role"] != "user":
+            continue
+        try:
+            content = json.loads(message["content"])
+        except (TypeError, ValueError):
+            continue
+        if isinstance(content, dict) and "tool_executed" in content:
+            return content.get("result")
+    return None
+
+
+class ScriptedResponses:
+    """
+    Deterministic generate_response that replays a fixed script of steps, one per call.
+    latency (seconds) simulates the LLM round trip.
+    """
+    def __init__(self, script: List[ScriptStep], loop: bool = False, latency: float = 0.0):
+        self.script = list(script)
+        self.loop = loop
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def next_step(self, prompt: Prompt) -> ScriptStep:
+        with self._lock:
+            if self.calls >= len(self.script) and not self.loop:
+                raise RuntimeError(f"Scripted LLM ran out of responses after {self.calls} calls")
+            step = self.script[self.calls % len(self.script)]
+            self.calls += 1
+        return step(prompt) if callable(step) else step
+
+    def __call__(self, prompt: Prompt) -> str:
+        step = self.next_step(prompt)
+        if self.latency:
+            time.sleep(self.latency)
+        return step if isinstance(step, str) else json.dumps(step)
+
+    def reset(self):
+        self.calls = 0
+
+
+def stream_chunks(step: Union[str, dict, list], chunk_chars: int = 8):
+    """Split a script step into chunks shaped like litellm's streamed deltas"""
+    def chunk(content=None, tool_calls=None):
+        return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content, tool_calls=tool_calls))])
+
+    if isinstance(step, str):
+        for start in range(0, len(step), chunk_chars):
+            yield chunk(content=step[start:start + chunk_chars])
+        return
+    for index, call in enumerate(step if isinstance(step, list) else [step]):
+        arguments = json.dumps(call.get("args", {}))
+        yield chunk(tool_calls=[SimpleNamespace(index=index, function=SimpleNamespace(name=call["tool"], arguments=""))])
+        for start in range(0, len(arguments), chunk_chars):
+            yield chunk(tool_calls=[SimpleNamespace(index=index, function=SimpleNamespace(
+                name=None, arguments=arguments[start:start + chunk_chars]))])
+
+
+class StreamingScriptedResponses(ScriptedResponses):
+    """
+    ScriptedResponses that can also stream (see module.llm_stream): each step is
+    cut into chunks of chunk_chars characters, chunk_latency seconds apart.
+    """
+    def __init__(self, script: List[ScriptStep], loop: bool = False, chunk_chars: int = 8, chunk_latency: float = 0.0):
+        super().__init__(script, loop=loop)
+        self.chunk_chars = chunk_chars
+        self.chunk_latency = chunk_latency
+
+    def stream(self, prompt: Prompt, on_tool_call=None, on_text=None) -> str:
+        from module.llm_stream import ToolCallAssembler
+        assembler = ToolCallAssembler(on_tool_call, on_text)
+        for chunk in stream_chunks(self.next_step(prompt), self.chunk_chars):
+            if self.chunk_latency:
+                time.sleep(self.chunk_latency)
+            assembler.feed(chunk)
+        return assembler.finish()
+
+    def __call__(self, prompt: Prompt) -> str:
+        return self.stream(prompt)
+
+
+class RecordingResponses:
+    """
+    Wraps a real generate_response and appends every (prompt key, response)
+    pair to a JSONL trace that ReplayResponses can play back offline.
+    """
+    def __init__(self, generate_response: Callable[[Prompt], str], trace_path: str, model: str = DEFAULT_MODEL):
+        self.generate_response = generate_response
+        self.trace_path = trace_path
+        self.model = model
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt: Prompt) -> str:
+        response = self.generate_response(prompt)
+        record = {
+            "key": prompt_key(prompt, self.model),
+            "response": response,
+        }
+        with self._lock, open(self.trace_path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        return response
+
+
+class ReplayResponses(ScriptedResponses):
+    """
+    Plays back a trace written by RecordingResponses.
+    A prompt seen during recording gets its recorded response, any other prompt
+    gets the next response in recording order.
+    """
+    def __init__(self, records: List[dict], model: str = DEFAULT_MODEL, latency: float = 0.0):
+        super().__init__([record["response"] for record in records], latency=latency)
+        self.model = model
+        self.by_key = {record["key"]: record["response"] for record in records}
+        self.key_hits = 0
+
+    @classmethod
+    def from_trace(cls, trace_path: str, **kwargs):
+        with open(trace_path, "r") as f:
+            return cls([json.loads(line) for line in f if line.strip()], **kwargs)
+
+    def next_step(self, prompt: Prompt) -> ScriptStep:
+        key = prompt_key(prompt, self.model)
+        if key in self.by_key:
+            with self._lock:
+                self.key_hits += 1
+            return self.by_key[key]
+        return super().next_step(prompt)
@@ -1,11 +1,28 @@
 
 from typing import Optional, Callable, Dict, List
 from dataclasses import dataclass, field
-from litellm import completion
 import json
 import time
+import asyncio
+import inspect
+import hashlib
 import traceback
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 import module.config as config
+from module.tracing import NULL_TRACER
+from module.tool_schema import ToolSchema, compile_tool_schema
+from module.schema import ToolArgumentError
+from module.tool_executor import ToolTimeoutError, get_shared_tool_executor
+from module.tool_manifest import load_tools, resolve_tool
+from module.result_store import shape_result, get_shared_result_store, using_result_store
+from module.agent_logging import get_logger, Truncated
+
+logger = get_logger("environment")
+
+DEFAULT_MODEL = "openai/gpt-4o"
+DEFAULT_MAX_TOKENS = 1024
 
 @dataclass(frozen=True) # a data class that cannot be modified
 class Goal:
@@ -19,69 +36,192 @@ class Prompt:
     tools: List[Dict] = field(default_factory=list)
     metadata: dict = field(default_factory=dict)  # Fixing mutable default issue
 
+def _response_to_text(response) -> str:
+    """
+    Turn a completion response into the text the agent parses (tool call JSON or plain content).
+    A single tool call is encoded as {"tool", "args"}, several calls from one turn as a list of them.
+    """
+    message = response.choices[0].message
+    if message.tool_calls:
+        result = [
+            {
+                "tool": tool.function.name,
+                "args": json.loads(tool.function.arguments),
+            } for tool in message.tool_calls
+        ]
+        return json.dumps(result[0] if len(result) == 1 else result)
+    return message.content
+
 def generate_response(prompt: Prompt) -> str:
     """Call LLM to get response"""
+    # litellm takes seconds to import, only pay for it once an LLM is actually called
+    from litellm import completion
 
     messages = prompt.messages
     tools = prompt.tools
+    # a model router (see module.model_router) may have picked the model for this turn
+    model = prompt.metadata.get("model", DEFAULT_MODEL)
+    max_tokens = prompt.metadata.get("max_tokens", DEFAULT_MAX_TOKENS)
 
     result = None
 
     if not tools:
         response = completion(
-            model="openai/gpt-4o",
+            model=model,
             messages=messages,
-            max_tokens=1024
+            max_tokens=max_tokens
         )
         result = response.choices[0].message.content
     else:
         response = completion(
-            model="openai/gpt-4o",
+            model=model,
             messages=messages,
             tools=tools,
-            max_tokens=1024
+            max_tokens=max_tokens
         )
-
-        if response.choices[0].message.tool_calls:
-            tool = response.choices[0].message.tool_calls[0]
-            result = {
-                "tool": tool.function.name,
-                "args": json.loads(tool.function.arguments),
-            }
-            result = json.dumps(result)
-        else:
-            result = response.choices[0].message.content
+        result = _response_to_text(response)
 
 
     return result
 
+async def agenerate_response(prompt: Prompt) -> str:
+    """Call LLM to get response without blocking the event loop"""
+    from litellm import acompletion
+    model = prompt.metadata.get("model", DEFAULT_MODEL)
+    max_tokens = prompt.metadata.get("max_tokens", DEFAULT_MAX_TOKENS)
+
+    if not prompt.tools:
+        response = await acompletion(
+            model=model,
+            messages=prompt.messages,
+            max_tokens=max_tokens
+        )
+        return response.choices[0].message.content
+
+    response = await acompletion(
+        model=model,
+        messages=prompt.messages,
+        tools=prompt.tools,
+        max_tokens=max_tokens
+    )
+    return _response_to_text(response)
+
 class Action:
     def __init__(self,
                  name: str,
                  function: Callable,
                  description: str,
                  parameters: Dict,
-                 terminal: bool = False):
+                 terminal: bool = False,
+                 pure: bool = False,
+                 cache_ttl: float = None,
+                 timeout: float = None,
+                 isolation: str = None,
+                 schema: ToolSchema = None,
+                 validate_args: Callable[[Dict], Dict] = None,
+                 import_path: str = None,
+                 tags: List[str] = None,
+                 result_fields: List[str] = None,
+                 page_size: int = None):
         self.name = name
-        self.function = function
+        self.tags = list(tags or [])
+        # a lazily registered tool has no function yet, only its import_path (see module.tool_manifest)
+        self._function = function
+        self.import_path = import_path
         self.description = description
         self.terminal = terminal
         self.parameters = parameters
+        # results of pure tools, or tools with a cache_ttl, can be reused by the Environment
+        self.pure = pure
+        self.cache_ttl = cache_ttl
+        # how the Environment runs the tool (see module.tool_executor)
+        self.timeout = timeout
+        self.isolation = isolation
+        self._schema = schema
+        # checks and converts the LLM's arguments (see module.schema), None to pass them as they are
+        self._validate_args = validate_args
+        # how much of the result the agent sees, the rest goes to the result store (see module.result_store)
+        self.result_fields = list(result_fields) if result_fields else None
+        self.page_size = page_size
+
+    def _resolve(self):
+        """Import a lazily registered tool, on its first execution"""
+        tool = resolve_tool(self.name, self.import_path)
+        self._validate_args = tool.get("validate_args")
+        self._function = tool["function"]
+
+    @property
+    def function(self) -> Callable:
+        if self._function is None and self.import_path:
+            self._resolve()
+        return self._function
+
+    @property
+    def validate_args(self) -> Optional[Callable[[Dict], Dict]]:
+        if self._function is None and self.import_path:
+            self._resolve()
+        return self._validate_args
+
+    @property
+    def schema(self) -> ToolSchema:
+        """The compiled LLM tool schema, shared with every other Action for the same tool"""
+        if self._schema is None:
+            self._schema = compile_tool_schema(self.name, self.description, self.parameters)
+        return self._schema
+
+    @classmethod
+    def from_tool(cls, name: str, tool_desc: Dict):
+        """Create an action from a config.TOOLS entry"""
+        return cls(
+            name=name,
+            function=tool_desc["function"],
+            description=tool_desc["description"],
+            parameters=tool_desc.get("parameters", {}),
+            terminal=tool_desc.get("terminal", False),
+            pure=tool_desc.get("pure", False),
+            cache_ttl=tool_desc.get("cache_ttl"),
+            timeout=tool_desc.get("timeout"),
+            isolation=tool_desc.get("isolation"),
+            schema=tool_desc.get("schema"),
+            validate_args=tool_desc.get("validate_args"),
+            import_path=tool_desc.get("import_path"),
+            tags=tool_desc.get("tags"),
+            result_fields=tool_desc.get("result_fields"),
+            page_size=tool_desc.get("page_size")
+        )
+
+    @property
+    def cacheable(self) -> bool:
+        return self.pure or self.cache_ttl is not None
 
     def execute(self, **args):
         """Execute the action's function"""
         return self.function(**args)
 
+    async def aexecute(self, **args):
+        """
+        Execute the action's function from async code.
+        Coroutine functions are awaited, blocking functions run in a worker thread.
+        """
+        if inspect.iscoroutinefunction(self.function):
+            return await self.function(**args)
+        return await asyncio.to_thread(self.function, **args)
+
 
 class ActionRegistry:
     def __init__(self):
         self.actions = {}
+        self.actions_by_tag = {}  # tag -> names of the registered actions with that tag
 
     def register(self, action: Action):
         """
         register the action in an action dictionary
         """
         self.actions[action.name] = action
+        for tag in action.tags:
+            names = self.actions_by_tag.setdefault(tag, [])
+            if action.name not in names:
+                names.append(action.name)
 
     def get_action(self, name: str) -> Optional[Action]:
         """
@@ -93,6 +233,13 @@ class ActionRegistry:
     def get_actions(self) -> List[Action]:
         """Get all registered actions"""
         return list(self.actions.values())
+
+    def get_action_names_by_tags(self, tags) -> set:
+        """Names of the registered actions carrying any of the tags"""
+        names = set()
+        for tag in tags:
+            names.update(self.actions_by_tag.get(tag, ()))
+        return names
     
 
     
@@ -100,40 +247,28 @@ class PythonActionRegistry(ActionRegistry):
     def __init__(self, tags: List[str] = None, tool_names: List[str] = None):
         super().__init__()
 
-        self.terminate_tool = None
-
-        # Register all tools from config
-        # If tool_names is provided and tags are provided, only register those tools
-        # if tool name is terminate, set it as terminate_tool
-        for tool_name, tool_desc in config.TOOLS.items():
-            if tool_name == "terminate":
-                self.terminate_tool = tool_desc
+        # tools from the manifest are registered without importing their modules
+        load_tools()
 
-            if tool_names and tool_name not in tool_names:
-                continue
+        self.terminate_tool = config.TOOLS.get("terminate")
 
-            tool_tags = tool_desc.get("tags", [])
-            if tags and not any(tag in tool_tags for tag in tags):
+        # Register the tools from config, only those with one of the tags and
+        # one of the tool_names when they are given. Tags are resolved through
+        # the TOOLS_BY_TAG index that register_tool maintains.
+        if tags:
+            candidates = dict.fromkeys(name for tag in tags for name in config.TOOLS_BY_TAG.get(tag, ()))
+        else:
+            candidates = config.TOOLS
+        wanted = set(tool_names) if tool_names else None
+        for tool_name in candidates:
+            if wanted is not None and tool_name not in wanted:
                 continue
-
-            self.register(Action(
-                name=tool_name,
-                function=tool_desc["function"],
-                description=tool_desc["description"],
-                parameters=tool_desc.get("parameters", {}),
-                terminal=tool_desc.get("terminal", False)
-            ))
+            self.register(Action.from_tool(tool_name, config.TOOLS[tool_name]))
 
     def register_terminate_tool(self):
         """Register the terminate tool if it exists in the registry"""
         if self.terminate_tool:
-            self.register(Action(
-                name="terminate",
-                function=self.terminate_tool["function"],
-                description=self.terminate_tool["description"],
-                parameters=self.terminate_tool.get("parameters", {}),
-                terminal=self.terminate_tool.get("terminal", False)
-            ))
+            self.register(Action.from_tool("terminate", self.terminate_tool))
         else:
             raise Exception("Terminate tool not found in tool registry")
 
@@ -141,6 +276,9 @@ class PythonActionRegistry(ActionRegistry):
 class Memory:
     def __init__(self):
         self.items = []  # Basic conversation history
+        # bumped whenever existing items are changed or removed (appends don't count),
+        # lets prompt builders reuse what they already formatted
+        self.revision = 0
 
     def add_memory(self, memory: dict):
         """Add memory to working memory"""
@@ -151,25 +289,158 @@ class Memory:
         return self.items[:limit]
 
 
+def tool_cache_key(name: str, args: Dict) -> str:
+    """Tool name plus canonical JSON of the args, hashed to keep keys small"""
+    canonical = json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{name}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+
+_shared_tool_cache = None
+_shared_tool_cache_lock = threading.Lock()
+
+def get_shared_tool_cache():
+    """Tool result cache shared by every Environment that isn't given its own"""
+    global _shared_tool_cache
+    with _shared_tool_cache_lock:
+        if _shared_tool_cache is None:
+            from module.llm_cache import InMemoryLRUCache
+            _shared_tool_cache = InMemoryLRUCache(max_entries=config.TOOL_CACHE_SIZE)
+        return _shared_tool_cache
+
+
 class Environment:
+    def __init__(self, max_parallel_tools: int = 8, tracer=None, tool_cache=None, tool_executor=None,
+                 result_store=None):
+        # pool used when the agent asks for several tool calls in one turn
+        self.max_parallel_tools = max_parallel_tools
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        # every tool execution is recorded as a "tool" span (see module.tracing)
+        self.tracer = tracer or NULL_TRACER
+        # results of cacheable (pure / ttl) tools, shared across sessions by default
+        # (an empty cache is falsy, hence the explicit None check)
+        self.tool_cache = tool_cache if tool_cache is not None else get_shared_tool_cache()
+        # runs tools inline, on worker threads or in child processes, with their timeouts
+        self.tool_executor = tool_executor or get_shared_tool_executor()
+        # full results of tools whose results are paged / projected, memory only holds a reference
+        # (an empty store is falsy, hence the explicit None check)
+        self.result_store = result_store if result_store is not None else get_shared_result_store()
+
+    @staticmethod
+    def validate_args(action: Action, args: Dict) -> Dict:
+        """Native, checked arguments for the call, raises ToolArgumentError before anything runs"""
+        if action.validate_args is None:
+            return args
+        return action.validate_args(args)
+
+    def _cached_result(self, action: Action, args: Dict):
+        """(cache key, cached result or None) for a call, the key is None for non-cacheable tools"""
+        if not action.cacheable:
+            return None, None
+        key = tool_cache_key(action.name, args)
+        cached = self.tool_cache.get(key)
+        if cached is not None:
+            logger.info("Reusing cached result of %s", action.name)
+            return key, self.format_result(self.shape_result(action, cached[0]), cached=True)
+        return key, None
+
     def execute_action(self, action: Action, args: Dict) -> dict:
         """Execute an action and return the result."""
-        print("#####")
-        print("Executing action:", action.name, "with args:", args)
+        logger.info("Executing action: %s with args: %s", action.name, Truncated(args))
+        try:
+            # bad arguments end up in format_error like any other failure, before the tool runs
+            args = self.validate_args(action, args)
+            key, cached = self._cached_result(action, args)
+            if cached is not None:
+                return cached
+            # fetch_more_results reads this environment's store
+            with self.tracer.span("tool", tool=action.name), using_result_store(self.result_store):
+                result = self.tool_executor.run(action, args)
+            if key is not None:
+                # wrapped so that a None result can be cached too
+                self.tool_cache.set(key, (result,), ttl=action.cache_ttl)
+            return self.format_result(self.shape_result(action, result))
+        except Exception as e:
+            return self.format_error(action, e)
+
+    async def aexecute_action(self, action: Action, args: Dict) -> dict:
+        """Execute an action without blocking the event loop and return the result."""
+        logger.info("Executing action: %s with args: %s", action.name, Truncated(args))
         try:
-            result = action.execute(**args)
-            return self.format_result(result)
+            # bad arguments end up in format_error like any other failure, before the tool runs
+            args = self.validate_args(action, args)
+            key, cached = self._cached_result(action, args)
+            if cached is not None:
+                return cached
+            with self.tracer.span("tool", tool=action.name), using_result_store(self.result_store):
+                result = await self.tool_executor.arun(action, args)
+            if key is not None:
+                self.tool_cache.set(key, (result,), ttl=action.cache_ttl)
+            return self.format_result(self.shape_result(action, result))
         except Exception as e:
+            return self.format_error(action, e)
+
+    def execute_actions(self, calls: List[tuple]) -> List[dict]:
+        """
+        Execute several (action, args) calls from the same turn concurrently.
+        Results are returned in the order of the calls.
+        """
+        if len(calls) <= 1:
+            return [self.execute_action(action, args) for action, args in calls]
+        futures = [self.submit_action(action, args) for action, args in calls]
+        return [future.result() for future in futures]
+
+    def submit_action(self, action: Action, args: Dict) -> Future:
+        """Start executing an action in the background, the Future resolves to execute_action's result"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_parallel_tools,
+                                                    thread_name_prefix="tool")
+        # run each call in a copy of the current context so its span nests under the caller's
+        return self._executor.submit(contextvars.copy_context().run, self.execute_action, action, args)
+
+    async def aexecute_actions(self, calls: List[tuple]) -> List[dict]:
+        """Execute several (action, args) calls from the same turn concurrently on the event loop."""
+        return list(await asyncio.gather(*(self.aexecute_action(action, args) for action, args in calls)))
+
+    def format_error(self, action: Action, error: Exception) -> dict:
+        """Format a failed execution so the model can react to it."""
+        if isinstance(error, ToolTimeoutError):
+            logger.warning("Action %s timed out after %ss", action.name, error.timeout)
             return {
                 "tool_executed": False,
-                "error": str(e),
-                "traceback": traceback.format_exc()
+                "error": "timeout",
+                "message": f"{error} and was cancelled. Try again with narrower arguments or use another tool.",
+                "timeout_seconds": error.timeout
             }
+        if isinstance(error, ToolArgumentError):
+            logger.warning("Action %s called with invalid arguments: %s", action.name, error)
+            return {
+                "tool_executed": False,
+                "error": "invalid_arguments",
+                "message": f"{error}. Fix the arguments to match the tool's parameters and call it again.",
+                "parameters": action.parameters
+            }
+        logger.warning("Action %s failed: %s", action.name, error)
+        return {
+            "tool_executed": False,
+            "error": str(error),
+            "traceback": getattr(error, "child_traceback", None) or traceback.format_exc()
+        }
+
+    def shape_result(self, action: Action, result):
+        """Page and project the result as declared by the tool (see module.result_store)"""
+        if action.result_fields is None and action.page_size is None:
+            return result
+        return shape_result(self.result_store, action.name, result, action.result_fields, action.page_size)
 
-    def format_result(self, result) -> dict:
+    def format_result(self, result, cached: bool = False) -> dict:
         """Format the result with metadata."""
-        return {
+        formatted = {
             "tool_executed": True,
             "result": result,
             "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")
         }
+        if cached:
+            formatted["cached"] = True
+        return formatted
@@ -0,0 +1,194 @@
+import json
+import time
+import hashlib
+import sqlite3
+import inspect
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+from module.game import Prompt, DEFAULT_MODEL
+from module.llm_stream import replay_response
+
+# =============================================
+# LLM response cache
+# =============================================
+def prompt_cache_key(model: str, messages: List[Dict], tools: List[Dict], tools_digest: str = None) -> str:
+    """
+    Canonical hash of a request: same model, messages and tools give the same key.
+    tools_digest (see module.tool_schema) stands in for the tools so they aren't serialized again.
+    """
+    canonical = json.dumps({"model": model, "messages": messages, "tools": tools_digest or tools},
+                           sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def prompt_key(prompt: Prompt, model: str = DEFAULT_MODEL) -> str:
+    """prompt_cache_key of a Prompt, using the model and tools digest from its metadata when set"""
+    return prompt_cache_key(prompt.metadata.get("model", model), prompt.messages, prompt.tools,
+                            prompt.metadata.get("tools_digest"))
+
+
+class ResponseCache:
+    """Base class for response caches, keeps the hit/miss/eviction counters"""
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def set(self, key: str, value: str, ttl: float = None):
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class InMemoryLRUCache(ResponseCache):
+    """
+    Thread-safe LRU cache with an optional time-to-live.
+    ttl applies to every entry unless set() is given its own.
+    """
+    def __init__(self, max_entries: int = 1024, ttl: float = None):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at or None)
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: str, value, ttl: float = None):
+        ttl = ttl if ttl is not None else self.ttl
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    On-disk cache in a SQLite file, shared across processes and runs.
+    The least recently used entries are evicted past max_entries.
+    """
+    def __init__(self, path: str, max_entries: int = 10000, ttl: float = None):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._db.commit()
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] is not None and row[1] <= now:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._db.commit()
+                self.evictions += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str, ttl: float = None):
+        ttl = ttl if ttl is not None else self.ttl
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO responses (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                             (key, value, now + ttl if ttl is not None else None, now))
+            (count,) = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()
+            if count > self.max_entries:
+                self._db.execute("""
+                    DELETE FROM responses WHERE key IN (
+                        SELECT key FROM responses ORDER BY accessed_at LIMIT ?
+                    )""", (count - self.max_entries,))
+                self.evictions += count - self.max_entries
+            self._db.commit()
+
+    def close(self):
+        self._db.close()
+
+
+def cached_generate_response(generate_response: Callable[[Prompt], str],
+                             cache: ResponseCache,
+                             model: str = DEFAULT_MODEL) -> Callable[[Prompt], str]:
+    """
+    Put a cache in front of a generate_response function (sync or async).
+    model only feeds the cache key and should be the model generate_response calls.
+    A streaming generate_response (one with a stream method, see module.llm_stream)
+    stays streaming: misses are streamed and their final text cached, hits are
+    replayed through the same callbacks.
+    """
+    if inspect.iscoroutinefunction(generate_response):
+        async def cached(prompt: Prompt) -> str:
+            key = prompt_key(prompt, model)
+            response = cache.get(key)
+            if response is None:
+                response = await generate_response(prompt)
+                if response is not None:
+                    cache.set(key, response)
+            return response
+    else:
+        def cached(prompt: Prompt) -> str:
+            key = prompt_key(prompt, model)
+            response = cache.get(key)
+            if response is None:
+                response = generate_response(prompt)
+                if response is not None:
+                    cache.set(key, response)
+            return response
+
+    if hasattr(generate_response, "stream"):
+        def stream(prompt: Prompt, on_tool_call=None, on_text=None) -> str:
+            key = prompt_key(prompt, model)
+            response = cache.get(key)
+            if response is not None:
+                return replay_response(response, on_tool_call, on_text)
+            response = generate_response.stream(prompt, on_tool_call=on_tool_call, on_text=on_text)
+            if response is not None:
+                cache.set(key, response)
+            return response
+
+        cached.stream = stream
+
+    cached.cache = cache
+    return cached
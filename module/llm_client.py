@@ -0,0 +1,308 @@
+import os
+import json
+import time
+import random
+import threading
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+import module.config as config
+from module.game import Prompt, DEFAULT_MODEL, DEFAULT_MAX_TOKENS
+from module.memory import estimate_tokens
+from module.llm_stream import ToolCallAssembler
+from module.agent_logging import get_logger
+
+logger = get_logger("llm_client")
+
+# =============================================
+# Pooled, rate-limited LLM client
+# =============================================
+# LLMClient is a generate_response (and a streaming one, see module.llm_stream)
+# that talks to an OpenAI-compatible chat completions endpoint through one
+# pooled keep-alive HTTP session. Every agent sharing the client shares its
+# limits: at most max_in_flight requests at a time and, optionally, a
+# tokens-per-minute budget. Rate-limited (429), overloaded (5xx) and dropped
+# requests are retried with full-jitter exponential backoff, honouring
+# Retry-After. Point api_base at benchmarks/llm_stub_server.py to run it offline.
+
+RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMRequestError(Exception):
+    def __init__(self, message: str, status: int = None, retry_after: float = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status is None or self.status in RETRY_STATUSES
+
+
+class LLMStreamError(LLMRequestError):
+    """The connection failed while a stream was being read, never retried: part of it was already delivered"""
+    @property
+    def retryable(self) -> bool:
+        return False
+
+
+class TokenBucket:
+    """Tokens-per-minute limiter, a request waits until the bucket holds its estimated tokens"""
+    def __init__(self, tokens_per_minute: float):
+        self.capacity = float(tokens_per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens: float) -> float:
+        """Take tokens, blocking as long as needed; returns the seconds waited"""
+        tokens = min(tokens, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def adjust(self, tokens: float):
+        """Settle the difference between the estimate and the tokens the request actually used"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - tokens)
+
+
+def _message_to_text(message: Dict) -> str:
+    """Same encoding as game._response_to_text, for a response decoded from JSON"""
+    tool_calls = message.get("tool_calls") or []
+    if tool_calls:
+        result = [{"tool": call["function"]["name"], "args": json.loads(call["function"]["arguments"] or "{}")}
+                  for call in tool_calls]
+        return json.dumps(result[0] if len(result) == 1 else result)
+    return message.get("content")
+
+
+class LLMClient:
+    def __init__(self,
+                 model: str = DEFAULT_MODEL,
+                 max_tokens: int = DEFAULT_MAX_TOKENS,
+                 api_base: str = None,
+                 api_key: str = None,
+                 max_in_flight: int = None,
+                 tokens_per_minute: float = None,
+                 max_retries: int = None,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 30.0,
+                 timeout: float = None):
+        """
+        model uses litellm's "provider/model" naming, the provider prefix is dropped on the wire.
+        api_key defaults to $OPENAI_API_KEY, the limits and retries to the LLM_* settings in module.config.
+        """
+        self.model = model
+        self.max_tokens = max_tokens
+        self.api_base = (api_base or config.LLM_API_BASE).rstrip("/")
+        self.api_key = api_key if api_key is not None else os.environ.get("OPENAI_API_KEY", "")
+        self.max_in_flight = max_in_flight or config.LLM_MAX_IN_FLIGHT
+        tokens_per_minute = tokens_per_minute or config.LLM_TOKENS_PER_MINUTE
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = config.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout or config.LLM_REQUEST_TIMEOUT
+        self._in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        self._session = None
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "retries": 0, "errors": 0, "throttled_s": 0.0, "tokens": 0}
+
+    @property
+    def session(self):
+        """The pooled HTTP session, created on first use (keeps connections alive across requests)"""
+        with self._lock:
+            if self._session is None:
+                import httpx  # installed with litellm
+                self._session = httpx.Client(
+                    base_url=self.api_base,
+                    headers={"Authorization": f"Bearer {self.api_key}"},
+                    limits=httpx.Limits(max_connections=self.max_in_flight,
+                                        max_keepalive_connections=self.max_in_flight),
+                    timeout=self.timeout,
+                )
+            return self._session
+
+    def _count(self, name: str, value=1):
+        with self._lock:
+            self.counters[name] += value
+
+    def _request_body(self, messages: List[Dict], tools: List[Dict], model: str, max_tokens: int, stream: bool) -> dict:
+        body = {"model": (model or self.model).split("/", 1)[-1],
+                "messages": messages,
+                "max_tokens": max_tokens or self.max_tokens}
+        if tools:
+            body["tools"] = tools
+        if stream:
+            body["stream"] = True
+            # the last chunk then carries the usage, to settle the token budget with
+            body["stream_options"] = {"include_usage": True}
+        return body
+
+    def backoff(self, attempt: int, retry_after: float = None) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    @staticmethod
+    def _estimate(body: dict, tools_json: str = None) -> int:
+        """Tokens a request can use at most: its prompt (tool schemas included) plus max_tokens"""
+        tokens = sum(estimate_tokens(message.get("content") or "") for message in body["messages"])
+        if body.get("tools"):
+            tokens += estimate_tokens(tools_json or json.dumps(body["tools"]))
+        return tokens + body["max_tokens"]
+
+    def _with_limits(self, body: dict, send: Callable[[dict], object], estimate: int):
+        """Run send(body) inside the in-flight and token limits, retrying failed attempts"""
+        if self.token_bucket is not None:
+            self._count("throttled_s", self.token_bucket.acquire(estimate))
+        attempt = 0
+        while True:
+            self._count("requests")
+            try:
+                with self._in_flight:
+                    return send(body)
+            except LLMRequestError as e:
+                if not e.retryable or attempt >= self.max_retries:
+                    self._count("errors")
+                    raise
+                delay = self.backoff(attempt, e.retry_after)
+                logger.warning("LLM request failed (%s), retry %d in %.2fs", e, attempt + 1, delay)
+                self._count("retries")
+                attempt += 1
+                time.sleep(delay)
+
+    def _settle(self, estimate: int, usage: Optional[dict]):
+        """Count the tokens a request used and refund the bucket what the estimate held back"""
+        if not usage:
+            return
+        used = usage.get("total_tokens") or 0
+        self._count("tokens", used)
+        if self.token_bucket is not None:
+            self.token_bucket.adjust(used - estimate)
+
+    @staticmethod
+    def _encode(body: dict, tools_json: str = None) -> bytes:
+        """The request as sent, with the tools spliced in from their precomputed JSON when given"""
+        if not tools_json or not body.get("tools"):
+            return json.dumps(body).encode("utf-8")
+        rest = json.dumps({name: value for name, value in body.items() if name != "tools"})
+        return (rest[:-1] + ',"tools":' + tools_json + "}").encode("utf-8")
+
+    def _post(self, body: dict, stream: bool = False, tools_json: str = None):
+        import httpx
+        content = self._encode(body, tools_json)
+        headers = {"Content-Type": "application/json"}
+        try:
+            if stream:
+                request = self.session.build_request("POST", "/chat/completions", content=content, headers=headers)
+                response = self.session.send(request, stream=True)
+            else:
+                response = self.session.post("/chat/completions", content=content, headers=headers)
+        except httpx.TransportError as e:
+            raise LLMRequestError(f"{type(e).__name__}: {e}")
+        if response.status_code >= 400:
+            if stream:
+                response.read()
+            retry_after = response.headers.get("retry-after")
+            try:
+                retry_after = float(retry_after) if retry_after else None
+            except ValueError:
+                retry_after = None
+            response.close()
+            raise LLMRequestError(f"HTTP {response.status_code}: {response.text[:200]}",
+                                  status=response.status_code, retry_after=retry_after)
+        return response
+
+    def complete(self, messages: List[Dict], tools: List[Dict] = None, model: str = None, max_tokens: int = None,
+                 tools_json: str = None) -> dict:
+        """One chat completion, the decoded JSON response; tools_json is tools already serialized"""
+        body = self._request_body(messages, tools, model, max_tokens, stream=False)
+        estimate = self._estimate(body, tools_json)
+        data = self._with_limits(body, lambda body: self._post(body, tools_json=tools_json).json(), estimate)
+        self._settle(estimate, data.get("usage"))
+        return data
+
+    def __call__(self, prompt: Prompt) -> str:
+        data = self.complete(prompt.messages, prompt.tools,
+                             prompt.metadata.get("model"), prompt.metadata.get("max_tokens"),
+                             prompt.metadata.get("tools_json"))
+        return _message_to_text(data["choices"][0]["message"])
+
+    def stream(self,
+               prompt: Prompt,
+               on_tool_call: Callable[[int, dict], None] = None,
+               on_text: Callable[[str], None] = None) -> str:
+        """
+        Streamed completion, see module.llm_stream. Only opening the stream is retried: a transport
+        error while reading it raises LLMStreamError, as its tool calls and text may already have
+        been handed to the callbacks.
+        """
+        body = self._request_body(prompt.messages, prompt.tools,
+                                  prompt.metadata.get("model"), prompt.metadata.get("max_tokens"), stream=True)
+        tools_json = prompt.metadata.get("tools_json")
+        estimate = self._estimate(body, tools_json)
+        assembler = ToolCallAssembler(on_tool_call, on_text)
+        usage = {}
+        import httpx
+
+        def send(body):
+            # the in-flight slot is held until the whole stream has been read
+            response = self._post(body, stream=True, tools_json=tools_json)
+            try:
+                for line in response.iter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data, object_hook=lambda fields: SimpleNamespace(**fields))
+                    if getattr(chunk, "usage", None):
+                        usage.update(vars(chunk.usage))
+                    assembler.feed(chunk)
+            except httpx.TransportError as e:
+                raise LLMStreamError(f"stream interrupted, {type(e).__name__}: {e}")
+            finally:
+                response.close()
+            return assembler.finish()
+
+        text = self._with_limits(body, send, estimate)
+        self._settle(estimate, usage)
+        return text
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counters)
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_llm_client() -> LLMClient:
+    """Client shared by every agent that isn't given its own, so they share one pool and one set of limits"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = LLMClient()
+        return _shared_client
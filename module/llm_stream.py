@@ -0,0 +1,227 @@
+import re
+import json
+from typing import Callable, Dict, Iterable, List
+from module.game import Prompt, DEFAULT_MODEL, DEFAULT_MAX_TOKENS
+
+# =============================================
+# Streaming LLM responses
+# =============================================
+# StreamingResponses is a generate_response that asks litellm for a streamed
+# completion. ToolCallAssembler rebuilds the tool calls from the streamed
+# deltas and reports each one as soon as its arguments JSON closes, so the
+# Agent can start executing it while the model is still generating the rest
+# of the turn. The "message" of a terminate call (and plain text replies) is
+# passed on chunk by chunk through on_text, for showing it to the user as it
+# is generated.
+
+# tool -> argument whose text is streamed to on_text while the call is generated
+STREAMED_ARGUMENTS = {"terminate": "message"}
+
+
+class _PartialString:
+    """Decodes the value of one string field of a JSON object that is still being generated"""
+    def __init__(self, field: str):
+        self.start = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self.offset = None  # where the value starts in the arguments text
+        self.emitted = 0    # decoded characters already handed out
+
+    def feed(self, text: str) -> str:
+        """The newly decoded part of the value, given all the arguments text so far"""
+        if self.offset is None:
+            match = self.start.search(text)
+            if match is None:
+                return ""
+            self.offset = match.end()
+        raw, end = text[self.offset:], 0
+        # take the value up to its closing quote, or up to the last complete escape sequence
+        while end < len(raw):
+            char = raw[end]
+            if char == '"':
+                break
+            if char == "\\":
+                size = 6 if raw[end + 1:end + 2] == "u" else 2
+                if end + size > len(raw):
+                    break
+                end += size
+            else:
+                end += 1
+        try:
+            decoded = json.loads('"' + raw[:end] + '"')
+        except ValueError:
+            return ""
+        new, self.emitted = decoded[self.emitted:], len(decoded)
+        return new
+
+
+class _PendingCall:
+    def __init__(self, index: int):
+        self.index = index
+        self.name = ""
+        self.arguments = ""
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.started = False
+        self.done = False
+        self.streamed = None  # _PartialString of the argument shown to the user, if any
+
+    def add(self, fragment: str) -> bool:
+        """Append argument text, True once the top-level JSON object closed"""
+        self.arguments += fragment
+        for char in fragment:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+                self.started = True
+            elif char in "}]":
+                self.depth -= 1
+        return self.started and self.depth == 0
+
+    def invocation(self) -> dict:
+        return {"tool": self.name, "args": json.loads(self.arguments or "{}")}
+
+
+class ToolCallAssembler:
+    """
+    Rebuilds the text and tool calls of a streamed completion from its chunks.
+
+    on_tool_call(position, invocation) is called with the call's position in the
+    turn and its {"tool", "args"} as soon as the call's arguments are complete, on_text(text) with every piece of plain content and
+    of the streamed arguments (see STREAMED_ARGUMENTS).
+    """
+    def __init__(self,
+                 on_tool_call: Callable[[int, dict], None] = None,
+                 on_text: Callable[[str], None] = None,
+                 streamed_arguments: Dict[str, str] = None):
+        self.on_tool_call = on_tool_call
+        self.on_text = on_text
+        self.streamed_arguments = STREAMED_ARGUMENTS if streamed_arguments is None else streamed_arguments
+        self.content = ""
+        self.calls: Dict[int, _PendingCall] = {}
+        self.completed: List[dict] = []
+
+    def _text(self, text: str):
+        if text and self.on_text is not None:
+            self.on_text(text)
+
+    def _complete(self, call: _PendingCall):
+        if call.done:
+            return
+        call.done = True
+        try:
+            invocation = call.invocation()
+        except ValueError:
+            return  # malformed arguments, left to the agent's parser once the stream ends
+        self.completed.append(invocation)
+        if self.on_tool_call is not None:
+            self.on_tool_call(sorted(self.calls).index(call.index), invocation)
+
+    def feed(self, chunk):
+        """Consume one streamed chunk (litellm / OpenAI delta format)"""
+        if not chunk.choices:
+            return
+        delta = chunk.choices[0].delta
+        content = getattr(delta, "content", None)
+        if content:
+            self.content += content
+            self._text(content)
+        for tool_delta in getattr(delta, "tool_calls", None) or []:
+            index = getattr(tool_delta, "index", None)
+            index = len(self.calls) if index is None else index
+            call = self.calls.get(index)
+            if call is None:
+                call = self.calls[index] = _PendingCall(index)
+                # a new call starting means the ones before it are finished
+                for earlier in self.calls.values():
+                    if earlier.index < index and not earlier.done and earlier.name:
+                        self._complete(earlier)
+            function = getattr(tool_delta, "function", None)
+            if function is None:
+                continue
+            if getattr(function, "name", None):
+                call.name += function.name
+                field = self.streamed_arguments.get(call.name)
+                call.streamed = _PartialString(field) if field else None
+            if getattr(function, "arguments", None):
+                closed = call.add(function.arguments)
+                if call.streamed is not None:
+                    self._text(call.streamed.feed(call.arguments))
+                if closed:
+                    self._complete(call)
+
+    def finish(self) -> str:
+        """Complete what's left once the stream ended and return the response text the agent parses"""
+        for index in sorted(self.calls):
+            self._complete(self.calls[index])
+        # same encoding as game._response_to_text
+        invocations = [self.calls[index].invocation() for index in sorted(self.calls)]
+        if invocations:
+            return json.dumps(invocations[0] if len(invocations) == 1 else invocations)
+        return self.content
+
+
+def consume_stream(chunks: Iterable,
+                   on_tool_call: Callable[[int, dict], None] = None,
+                   on_text: Callable[[str], None] = None) -> str:
+    assembler = ToolCallAssembler(on_tool_call, on_text)
+    for chunk in chunks:
+        assembler.feed(chunk)
+    return assembler.finish()
+
+
+def replay_response(response: str,
+                    on_tool_call: Callable[[int, dict], None] = None,
+                    on_text: Callable[[str], None] = None) -> str:
+    """Report an already complete response (e.g. from a cache) through the same callbacks as a stream"""
+    try:
+        decoded = json.loads(response)
+    except (TypeError, ValueError):
+        decoded = None
+    invocations = decoded if isinstance(decoded, list) else [decoded]
+    if not all(isinstance(invocation, dict) and "tool" in invocation for invocation in invocations):
+        if response and on_text is not None:
+            on_text(response)
+        return response
+    for position, invocation in enumerate(invocations):
+        if on_tool_call is not None:
+            on_tool_call(position, invocation)
+        field = STREAMED_ARGUMENTS.get(invocation["tool"])
+        text = (invocation.get("args") or {}).get(field) if field else None
+        if isinstance(text, str) and text and on_text is not None:
+            on_text(text)
+    return response
+
+
+class StreamingResponses:
+    """
+    generate_response backed by a streamed litellm completion.
+    Called plainly it returns the same text as game.generate_response; the Agent
+    calls stream() instead to get tool calls and text while they are generated.
+    """
+    def __init__(self, model: str = DEFAULT_MODEL, max_tokens: int = DEFAULT_MAX_TOKENS):
+        self.model = model
+        self.max_tokens = max_tokens
+
+    def stream(self,
+               prompt: Prompt,
+               on_tool_call: Callable[[int, dict], None] = None,
+               on_text: Callable[[str], None] = None) -> str:
+        from litellm import completion
+        # a model router (see module.model_router) may have picked the model for this turn
+        request = {"model": prompt.metadata.get("model", self.model),
+                   "messages": prompt.messages,
+                   "max_tokens": prompt.metadata.get("max_tokens", self.max_tokens)}
+        if prompt.tools:
+            request["tools"] = prompt.tools
+        return consume_stream(completion(stream=True, **request), on_tool_call, on_text)
+
+    def __call__(self, prompt: Prompt) -> str:
+        return self.stream(prompt)
@@ -0,0 +1,95 @@
+from typing import Callable
+from module.game import Memory
+
+# =============================================
+# Token-budgeted memory
+# =============================================
+# rough size of the role/formatting wrapper around each message
+MESSAGE_OVERHEAD_TOKENS = 4
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English/JSON text)"""
+    return len(text) // CHARS_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+
+
+def truncate_summary(item: dict, max_tokens: int) -> str:
+    """Default compaction: keep the head of the content and note how much was cut"""
+    content = item.get("content") or ""
+    keep = max_tokens * CHARS_PER_TOKEN
+    if len(content) <= keep:
+        return content
+    return f"{content[:keep]}... [compacted, {len(content) - keep} characters omitted]"
+
+
+class TokenBudgetMemory(Memory):
+    """
+    Memory that keeps the prompt under an approximate token budget.
+
+    Every item's token count is tracked as it is added. When the total goes
+    over max_tokens, items older than the keep_recent most recent ones are
+    compacted oldest first: large items are replaced by a summary
+    (policy="summarize"), and if that is not enough, or with policy="drop",
+    the oldest items are removed. The first item (the user's task) is
+    always kept.
+    """
+    def __init__(self,
+                 max_tokens: int = 8000,
+                 keep_recent: int = 4,
+                 summary_tokens: int = 150,
+                 policy: str = "summarize",
+                 summarize: Callable[[dict, int], str] = truncate_summary):
+        super().__init__()
+        if policy not in ("summarize", "drop"):
+            raise ValueError(f"Unknown memory compaction policy: {policy}")
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.summary_tokens = summary_tokens
+        self.policy = policy
+        self.summarize = summarize
+        self.token_counts = []
+        self.total_tokens = 0
+
+    def _count(self, item: dict) -> int:
+        return estimate_tokens(item.get("content") or "")
+
+    def add_memory(self, memory: dict):
+        """Add memory to working memory, compacting older items if over budget"""
+        tokens = self._count(memory)
+        self.items.append(memory)
+        self.token_counts.append(tokens)
+        self.total_tokens += tokens
+        if self.total_tokens > self.max_tokens:
+            self.compact()
+
+    def compact(self):
+        """Bring the memory back under budget by summarizing, then dropping, older items"""
+        # items 1 .. end-keep_recent are eligible, item 0 is the task
+        end = len(self.items) - self.keep_recent
+
+        if self.policy == "summarize":
+            for i in range(1, end):
+                if self.total_tokens <= self.max_tokens:
+                    return
+                item = self.items[i]
+                if item.get("compacted") or self.token_counts[i] <= self.summary_tokens:
+                    continue
+                content = self.summarize(item, self.summary_tokens)
+                if content == item.get("content"):
+                    continue  # nothing to cut, the item stays as it is
+                self._replace(i, {**item, "content": content, "compacted": True})
+
+        while self.total_tokens > self.max_tokens and end > 1:
+            self.total_tokens -= self.token_counts.pop(1)
+            self.items.pop(1)
+            self.revision += 1
+            end -= 1
+
+    def _replace(self, index: int, item: dict):
+        # earlier items changed, prompts built incrementally from them must start over
+        self.revision += 1
+        tokens = self._count(item)
+        self.total_tokens += tokens - self.token_counts[index]
+        self.items[index] = item
+        self.token_counts[index] = tokens
@@ -0,0 +1,108 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from module.game import Goal, Memory, Prompt, DEFAULT_MODEL, DEFAULT_MAX_TOKENS
+from module.memory import estimate_tokens
+from module.tool_selection import previous_tool_names
+
+# =============================================
+# Per-turn model routing
+# =============================================
+# With a ModelRouter the Agent picks the model for each turn instead of
+# sending every turn to DEFAULT_MODEL: routine steps (e.g. calling
+# summarize_options right after search_property) go to a fast model, the rest
+# to a large one. The chosen route's model and max_tokens are put in
+# prompt.metadata, which generate_response, StreamingResponses and LLMClient
+# read. Rules, first match wins:
+#   large_prompt_tokens  prompts at least this big go to large_prompt_route
+#   after_tools          previous tool -> route for the turn that follows it
+#   goal_priorities      priority of the most important goal -> route
+# and default otherwise. Each route keeps its call count, latency, tokens and cost.
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    name: str
+    model: str = DEFAULT_MODEL
+    max_tokens: int = DEFAULT_MAX_TOKENS
+    input_cost_per_1k: float = 0.0   # USD per 1000 prompt tokens
+    output_cost_per_1k: float = 0.0  # USD per 1000 completion tokens
+
+
+class RouteStats:
+    def __init__(self):
+        self.calls = 0
+        self.latency_s = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "latency_s": self.latency_s,
+            "avg_latency_s": self.latency_s / self.calls if self.calls else 0.0,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost": self.cost,
+        }
+
+
+class ModelRouter:
+    def __init__(self,
+                 routes: List[ModelRoute],
+                 default: str,
+                 after_tools: Dict[str, str] = None,
+                 large_prompt_tokens: int = None,
+                 large_prompt_route: str = None,
+                 goal_priorities: Dict[int, str] = None):
+        self.routes = {route.name: route for route in routes}
+        self.default = default
+        self.after_tools = dict(after_tools or {})
+        self.large_prompt_tokens = large_prompt_tokens
+        self.large_prompt_route = large_prompt_route or default
+        self.goal_priorities = dict(goal_priorities or {})
+        for name in [default, self.large_prompt_route, *self.after_tools.values(), *self.goal_priorities.values()]:
+            if name not in self.routes:
+                raise ValueError(f"Unknown model route '{name}'")
+        self._stats = {name: RouteStats() for name in self.routes}
+        self._lock = threading.Lock()
+
+    def select(self, goals: List[Goal], memory: Memory, prompt_tokens: int = None) -> ModelRoute:
+        """Route for the next turn"""
+        if self.large_prompt_tokens is not None and prompt_tokens is not None \
+                and prompt_tokens >= self.large_prompt_tokens:
+            return self.routes[self.large_prompt_route]
+        previous = previous_tool_names(memory)
+        # several calls last turn: the turn after them is only routine if all of them say so
+        routes = {self.after_tools.get(name) for name in previous}
+        if previous and len(routes) == 1 and None not in routes:
+            return self.routes[routes.pop()]
+        if goals and self.goal_priorities:
+            name = self.goal_priorities.get(min(goal.priority for goal in goals))
+            if name is not None:
+                return self.routes[name]
+        return self.routes[self.default]
+
+    def apply(self, prompt: Prompt, route: ModelRoute):
+        prompt.metadata["model"] = route.model
+        prompt.metadata["max_tokens"] = route.max_tokens
+        prompt.metadata["route"] = route.name
+
+    def record(self, route: ModelRoute, latency_s: float, prompt_tokens: int, response: Optional[str]):
+        """Account one call; completion tokens are estimated from the response text"""
+        completion_tokens = estimate_tokens(response or "")
+        cost = (prompt_tokens * route.input_cost_per_1k + completion_tokens * route.output_cost_per_1k) / 1000
+        with self._lock:
+            stats = self._stats[route.name]
+            stats.calls += 1
+            stats.latency_s += latency_s
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            stats.cost += cost
+
+    def stats(self) -> Dict[str, dict]:
+        """route name -> calls, latency, tokens and cost so far"""
+        with self._lock:
+            return {name: stats.as_dict() for name, stats in self._stats.items()}
+
@@ -0,0 +1,72 @@
+import json
+import threading
+from typing import Any, Callable, Dict, Optional
+from module.game import ActionRegistry, Memory
+from module.tool_selection import previous_tool_names
+
+# =============================================
+# Fast-path planning
+# =============================================
+# A FastPathPlanner is consulted by the Agent before it prompts the LLM. When
+# the previous turn called a single tool that has a rule and the rule can
+# build the next invocation from that tool's result (e.g. search_property
+# with the criteria get_search_criteria returned), the Agent executes it
+# directly and skips the LLM round trip. A rule returns None when the next
+# step needs judgement, and the LLM decides as usual. Planned turns are
+# recorded in memory exactly like LLM turns.
+
+# previous tool -> rule(previous tool's result) -> {"tool", "args"} or None
+Rule = Callable[[Any], Optional[dict]]
+
+
+def previous_tool_result(memory: Memory):
+    """(found, result) of the last turn's tool call, found is False if it failed or wasn't a single call"""
+    for item in reversed(memory.get_memories()):
+        if item.get("type") == "assistant":
+            return False, None  # no result recorded after the last decision
+        if item.get("type") != "user":
+            continue
+        try:
+            result = json.loads(item.get("content") or "")
+        except (TypeError, ValueError):
+            return False, None
+        if not isinstance(result, dict) or not result.get("tool_executed"):
+            return False, None
+        return True, result.get("result")
+    return False, None
+
+
+class FastPathPlanner:
+    def __init__(self, rules: Dict[str, Rule]):
+        self.rules = dict(rules)
+        self.consulted = 0
+        self.planned = {name: 0 for name in self.rules}
+        self._lock = threading.Lock()
+
+    def plan(self, memory: Memory, registry: ActionRegistry) -> Optional[dict]:
+        """The next invocation when the transition is deterministic, None to ask the LLM"""
+        with self._lock:
+            self.consulted += 1
+        previous = previous_tool_names(memory)
+        if len(previous) != 1 or previous[0] not in self.rules:
+            return None
+        found, result = previous_tool_result(memory)
+        if not found:
+            return None
+        invocation = self.rules[previous[0]](result)
+        if invocation is None or registry.get_action(invocation["tool"]) is None:
+            return None
+        with self._lock:
+            self.planned[previous[0]] += 1
+        return invocation
+
+    def stats(self) -> dict:
+        """Turns planned without the LLM (round trips saved), overall and per rule"""
+        with self._lock:
+            saved = sum(self.planned.values())
+            return {
+                "consulted": self.consulted,
+                "round_trips_saved": saved,
+                "llm_fallbacks": self.consulted - saved,
+                "by_rule": dict(self.planned),
+            }
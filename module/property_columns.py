@@ -0,0 +1,120 @@
+from itertools import islice
+from typing import Dict, List
+from module.property_store import PropertyStore, matches_criteria, EXACT_SEARCH_FIELDS
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for the columnar backend
+    np = None
+
+# =============================================
+# Columnar (NumPy) property store
+# =============================================
+# string fields stored as categorical codes
+CATEGORICAL_FIELDS = ["location", "roofing_material", "siding_material", "heating", "cooling"]
+# numeric fields stored as typed arrays
+INT_FIELDS = ["num_of_bedrooms", "num_of_bathrooms", "year_built", "last_sold_price"]
+FLOAT_FIELDS = ["price", "hoa_fee"]
+BOOL_FIELDS = ["has_garage", "has_hoa"]
+
+
+class ColumnarPropertyStore(PropertyStore):
+    """
+    Property store that keeps the searchable fields as typed NumPy columns.
+
+    Criteria are evaluated as vectorized boolean masks; criteria on fields
+    without a column fall back to the row predicate on the masked rows only.
+    """
+    def __init__(self, file_path: str):
+        if np is None:
+            raise ImportError("The columnar property store needs numpy: pip install numpy")
+        super().__init__(file_path)
+        # (records, columns, valid, categories), replaced as a whole on reload:
+        #   columns     field -> np.ndarray
+        #   valid       field -> mask of rows where the field is present
+        #   categories  categorical field -> {value: code}
+        self._data = ([], {}, {}, {})
+
+    def _build_indexes(self, records: List[dict]):
+        columns, valid, categories = {}, {}, {}
+
+        for name in CATEGORICAL_FIELDS:
+            codes = {}
+            # missing values get their own code like any other value
+            columns[name] = np.fromiter((codes.setdefault(prop.get(name), len(codes)) for prop in records),
+                                        dtype=np.int32, count=len(records))
+            categories[name] = codes
+
+        for name, dtype in [(n, np.int64) for n in INT_FIELDS] + \
+                           [(n, np.float64) for n in FLOAT_FIELDS] + \
+                           [(n, np.bool_) for n in BOOL_FIELDS]:
+            values = [prop.get(name) for prop in records]
+            present = np.fromiter((v is not None for v in values), dtype=np.bool_, count=len(values))
+            if not present.all():
+                values = [0 if v is None else v for v in values]
+                valid[name] = present
+            try:
+                column = np.array(values)
+            except (TypeError, ValueError):
+                valid.pop(name, None)
+                continue
+            if column.dtype.kind not in "biuf":
+                # mixed/dirty data stays row-by-row (no column for it)
+                valid.pop(name, None)
+                continue
+            # keep fractional values (e.g. 2.5 bathrooms) instead of truncating them
+            columns[name] = column if column.dtype.kind == "f" and dtype != np.bool_ else column.astype(dtype)
+
+        # swap in one go so concurrent readers never see columns of another load
+        self._data = (records, columns, valid, categories)
+
+    @staticmethod
+    def _mask(data: tuple, name: str, value, partial_search: bool):
+        """Boolean mask for a single criterion, or None if the field has no column"""
+        records, columns, valid, categories = data
+        if name in categories:
+            code = categories[name].get(value)
+            if code is None:
+                return np.zeros(len(records), dtype=np.bool_)
+            return columns[name] == code
+
+        if name not in columns:
+            return None
+
+        column = columns[name]
+        if not isinstance(value, (bool, int, float)):
+            # a value of the wrong type never equals a number
+            return np.zeros(len(records), dtype=np.bool_)
+
+        if name == "year_built":
+            mask = column >= value if partial_search else column > value
+        else:
+            mask = column == value
+        if name in valid:
+            mask &= valid[name]
+        return mask
+
+    def search(self, criteria: Dict, partial_search: bool, limit: int = None) -> List[dict]:
+        """Return the properties matching the criteria (at most limit), in dataset order"""
+        self._ensure_fresh()
+        # read once: the records and columns of a single load, even if a reload happens meanwhile
+        data = self._data
+        records, fields = data[0], criteria.keys() if partial_search else EXACT_SEARCH_FIELDS
+
+        mask = np.ones(len(records), dtype=np.bool_)
+        unindexed = {}
+        for name in fields:
+            value = criteria.get(name)
+            if value is None:
+                continue
+            criterion_mask = self._mask(data, name, value, partial_search)
+            if criterion_mask is None:
+                unindexed[name] = value
+            else:
+                mask &= criterion_mask
+
+        row_ids = np.flatnonzero(mask)
+        if not unindexed:
+            return [records[row_id] for row_id in row_ids[:limit]]
+        matches = (records[row_id] for row_id in row_ids if matches_criteria(records[row_id], unindexed, True))
+        return list(islice(matches, limit))
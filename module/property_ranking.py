@@ -0,0 +1,77 @@
+import heapq
+from itertools import count
+from typing import Dict, Iterable, List
+
+# =============================================
+# Scored top-k matching for partial searches
+# =============================================
+# relative importance of each criterion in the overall score
+DEFAULT_WEIGHTS = {
+    "location": 3.0,
+    "price": 2.0,
+    "num_of_bedrooms": 2.0,
+    "num_of_bathrooms": 1.5,
+    "year_built": 1.0,
+    "has_garage": 1.0,
+}
+OTHER_FIELD_WEIGHT = 1.0
+# a listing this many years older than the requested minimum scores 0 on year_built
+YEAR_TOLERANCE = 30
+# price similarity is 1 within PRICE_BAND of the target and 0 beyond PRICE_TOLERANCE
+PRICE_BAND = 0.10
+PRICE_TOLERANCE = 0.50
+
+
+def _similarity(name: str, wanted, value) -> float:
+    """How close one field of a listing is to the requested value, between 0 and 1"""
+    if value is None:
+        return 0.0
+    if name == "location":
+        if value == wanted:
+            return 1.0
+        # same city, different neighbourhood ("Sloan Lake, Denver" vs "Highlands, Denver")
+        if isinstance(value, str) and isinstance(wanted, str) and "," in wanted:
+            return 0.5 if value.rsplit(",", 1)[-1].strip() == wanted.rsplit(",", 1)[-1].strip() else 0.0
+        return 0.0
+    if isinstance(wanted, bool) or isinstance(value, bool) or \
+            not isinstance(wanted, (int, float)) or not isinstance(value, (int, float)):
+        return 1.0 if value == wanted else 0.0
+    if name == "year_built":
+        # the requested year is a minimum
+        return 1.0 if value >= wanted else max(0.0, 1.0 - (wanted - value) / YEAR_TOLERANCE)
+    if name == "price":
+        if not wanted:
+            return 1.0 if value == wanted else 0.0
+        off = abs(value - wanted) / wanted
+        if off <= PRICE_BAND:
+            return 1.0
+        return max(0.0, 1.0 - (off - PRICE_BAND) / (PRICE_TOLERANCE - PRICE_BAND))
+    # counts such as bedrooms/bathrooms: one room off halves the similarity
+    return 1.0 / (1.0 + abs(value - wanted))
+
+
+def score_property(prop: dict, criteria: Dict, weights: Dict = None) -> float:
+    """Weighted similarity of a listing to the criteria, between 0 and 1"""
+    weights = weights or DEFAULT_WEIGHTS
+    total = score = 0.0
+    for name, wanted in criteria.items():
+        if wanted is None:
+            continue
+        weight = weights.get(name, OTHER_FIELD_WEIGHT)
+        total += weight
+        score += weight * _similarity(name, wanted, prop.get(name))
+    return score / total if total else 1.0
+
+
+def top_k_properties(properties: Iterable[dict], criteria: Dict, k: int, weights: Dict = None) -> List[dict]:
+    """
+    Return the k listings closest to the criteria, best first.
+
+    Uses a bounded heap, so ranking n listings costs O(n log k) and never
+    holds more than k candidates. Listings with a score of 0 are left out.
+    Each returned listing is a copy with its "match_score" added.
+    """
+    order = count()  # keeps dataset order between equal scores
+    scored = ((score_property(prop, criteria, weights), -next(order), prop) for prop in properties)
+    best = heapq.nlargest(k, (item for item in scored if item[0] > 0), key=lambda item: item[:2])
+    return [{**prop, "match_score": round(score, 3)} for score, _, prop in best]
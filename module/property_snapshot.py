@@ -0,0 +1,412 @@
+import os
+import sys
+import json
+import mmap
+import struct
+import argparse
+import threading
+from array import array
+from itertools import islice
+from typing import Dict, List
+from module.property_stream import load_properties
+from module.property_store import EXACT_SEARCH_FIELDS
+
+try:
+    import numpy as np
+except ImportError:  # numpy only speeds up snapshot searches, it is not required
+    np = None
+
+# =============================================
+# Compact binary property snapshots
+# =============================================
+# File layout (all numbers in the byte order of the machine that built it):
+#   magic (8 bytes) | header length (uint32) | header JSON | padding to 8 bytes | data
+# The header describes every column and where its sections start in the data
+# area. Column kinds:
+#   int64 / float64 / bool  fixed-width values (+ a uint8 "present" mask if a value is missing,
+#                           a uint8 "nulls" mask if some records have the key set to null, and
+#                           for float64 a uint8 "ints" mask of the values that were integers)
+#   str                     int32 codes (-1 = missing, -2 = null) into a dictionary table stored
+#                           as int64 offsets + one utf-8 blob
+#   json                    like str, but each dictionary entry is a JSON-encoded value
+#                           (used for columns with mixed types)
+# Records read back from a snapshot equal the source records: keys set to null
+# stay null, missing keys stay missing and integers stay integers.
+MAGIC = b"PSNAP\x00\x00\x01"
+VERSION = 2
+SNAPSHOT_SUFFIX = ".snap"
+_HEADER_LEN = struct.Struct("<I")
+_TYPECODES = {"int64": "q", "float64": "d", "bool": "B", "codes": "i", "offsets": "q"}
+MISSING_CODE, NULL_CODE = -1, -2
+# integers up to this size are exact in a float64 column
+_MAX_EXACT_FLOAT_INT = 2**53
+_MISSING = object()
+
+
+def default_snapshot_path(json_path: str) -> str:
+    return json_path + SNAPSHOT_SUFFIX
+
+
+def _column_kind(values: list) -> str:
+    present = [v for v in values if v is not None]
+    if all(isinstance(v, bool) for v in present):
+        return "bool"
+    if all(isinstance(v, int) and not isinstance(v, bool) and -2**63 <= v < 2**63 for v in present):
+        return "int64"
+    if all(isinstance(v, float) or isinstance(v, int) and not isinstance(v, bool) and abs(v) <= _MAX_EXACT_FLOAT_INT
+           for v in present):
+        return "float64"
+    if all(isinstance(v, str) for v in present):
+        return "str"
+    return "json"
+
+
+def build_snapshot(json_path: str, snapshot_path: str = None) -> str:
+    """Compile a JSON/NDJSON property dataset into a binary snapshot file"""
+    snapshot_path = snapshot_path or default_snapshot_path(json_path)
+    records = load_properties(json_path)
+
+    # keep the field order of the source records
+    names = list(dict.fromkeys(name for prop in records for name in prop))
+
+    sections = []  # byte strings making up the data area, each 8-byte aligned
+    size = 0
+
+    def add_section(data: bytes) -> int:
+        nonlocal size
+        offset = size
+        data += b"\x00" * (-len(data) % 8)
+        sections.append(data)
+        size += len(data)
+        return offset
+
+    columns = []
+    for name in names:
+        values = [prop.get(name, _MISSING) for prop in records]
+        nulls = [v is None for v in values]
+        values = [None if v is _MISSING else v for v in values]
+        kind = _column_kind(values)
+        column = {"name": name, "kind": kind, "mask": None, "nulls": None, "ints": None}
+
+        if kind in ("str", "json"):
+            table = {}
+            encode = (lambda v: v) if kind == "str" else json.dumps
+            codes = array(_TYPECODES["codes"],
+                          ((NULL_CODE if null else MISSING_CODE) if v is None else table.setdefault(encode(v), len(table))
+                           for v, null in zip(values, nulls)))
+            blobs = [s.encode("utf-8") for s in table]
+            offsets = array(_TYPECODES["offsets"], [0])
+            for blob in blobs:
+                offsets.append(offsets[-1] + len(blob))
+            column.update(size=len(table),
+                          data=add_section(codes.tobytes()),
+                          offsets=add_section(offsets.tobytes()),
+                          blob=add_section(b"".join(blobs)))
+        else:
+            if any(v is None for v in values):
+                column["mask"] = add_section(bytes(v is not None for v in values))
+                if any(nulls):
+                    column["nulls"] = add_section(bytes(nulls))
+                values = [0 if v is None else v for v in values]
+            if kind == "float64" and any(isinstance(v, int) for v in values):
+                column["ints"] = add_section(bytes(isinstance(v, int) for v in values))
+            column["data"] = add_section(array(_TYPECODES[kind], values).tobytes())
+        columns.append(column)
+
+    header = json.dumps({
+        "version": VERSION,
+        "byteorder": sys.byteorder,
+        "rows": len(records),
+        "columns": columns,
+    }).encode("utf-8")
+    prefix = MAGIC + _HEADER_LEN.pack(len(header)) + header
+    prefix += b"\x00" * (-len(prefix) % 8)
+
+    # write next to the target and swap it in, readers never see a partial file
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(prefix)
+        for section in sections:
+            f.write(section)
+    os.replace(tmp_path, snapshot_path)
+    return snapshot_path
+
+
+class PropertySnapshot:
+    """Read-only, memory-mapped view of a snapshot file"""
+    def __init__(self, snapshot_path: str):
+        self.snapshot_path = snapshot_path
+        # searches in progress; a replaced snapshot is closed once the last one is done
+        self._users = 0
+        self._retired = False
+        self._state_lock = threading.Lock()
+        with open(snapshot_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = memoryview(self._mmap)
+        try:
+            if bytes(buffer[:len(MAGIC)]) != MAGIC:
+                raise ValueError(f"{snapshot_path} is not a property snapshot")
+            (header_len,) = _HEADER_LEN.unpack_from(buffer, len(MAGIC))
+            header_start = len(MAGIC) + _HEADER_LEN.size
+            header = json.loads(bytes(buffer[header_start:header_start + header_len]))
+            if header["version"] != VERSION or header["byteorder"] != sys.byteorder:
+                raise ValueError(f"{snapshot_path} was built by an incompatible version or machine")
+        except ValueError:
+            buffer.release()
+            self._mmap.close()
+            raise
+
+        self.rows = header["rows"]
+        self.base = header_start + header_len + (-(header_start + header_len) % 8)
+        self.columns = {column["name"]: column for column in header["columns"]}
+        self._buffer = buffer
+        self._views = {}
+        self._code_tables = {}
+
+    def acquire(self):
+        with self._state_lock:
+            self._users += 1
+
+    def release(self):
+        with self._state_lock:
+            self._users -= 1
+            close = self._retired and self._users == 0
+        if close:
+            self.close()
+
+    def retire(self):
+        """Close the snapshot once no search uses it anymore"""
+        with self._state_lock:
+            self._retired = True
+            close = self._users == 0
+        if close:
+            self.close()
+
+    def close(self):
+        """Unmap the file, the typed views over it have to be released first"""
+        for view in self._views.values():
+            view.release()
+        self._views.clear()
+        self._buffer.release()
+        self._mmap.close()
+
+    def _view(self, column: dict, section: str, typecode: str, count: int) -> memoryview:
+        """Zero-copy typed view over one section of a column"""
+        key = (column["name"], section)
+        view = self._views.get(key)
+        if view is None:
+            start = self.base + column[section]
+            view = self._views[key] = self._buffer[start:start + count * struct.calcsize(typecode)].cast(typecode)
+        return view
+
+    def values(self, name: str) -> memoryview:
+        """Fixed-width values (or dictionary codes) of a column"""
+        column = self.columns[name]
+        typecode = _TYPECODES["codes" if column["kind"] in ("str", "json") else column["kind"]]
+        return self._view(column, "data", typecode, self.rows)
+
+    def present(self, name: str):
+        """uint8 mask of rows where the column has a value, None if it is never missing"""
+        return self._mask(name, "mask")
+
+    def _mask(self, name: str, section: str):
+        column = self.columns[name]
+        return self._view(column, section, "B", self.rows) if column.get(section) is not None else None
+
+    def decode(self, name: str, code: int):
+        """Look a dictionary code up in a string/json column"""
+        column = self.columns[name]
+        offsets = self._view(column, "offsets", "q", column["size"] + 1)
+        start = self.base + column["blob"]
+        text = str(self._buffer[start + offsets[code]:start + offsets[code + 1]], "utf-8")
+        return text if column["kind"] == "str" else json.loads(text)
+
+    def code_of(self, name: str, value) -> int:
+        """Dictionary code of a value in a string column (-1 if it never occurs)"""
+        table = self._code_tables.get(name)
+        if table is None:
+            column = self.columns[name]
+            table = self._code_tables[name] = {self.decode(name, code): code for code in range(column["size"])}
+        return table.get(value, -1) if isinstance(value, str) else -1
+
+    def value(self, name: str, row_id: int, default=None):
+        """The row's value, None if it is null and default if the record has no such key"""
+        column = self.columns.get(name)
+        if column is None:
+            return default
+        if column["kind"] in ("str", "json"):
+            code = self.values(name)[row_id]
+            if code < 0:
+                return None if code == NULL_CODE else default
+            return self.decode(name, code)
+        present = self.present(name)
+        if present is not None and not present[row_id]:
+            nulls = self._mask(name, "nulls")
+            return None if nulls is not None and nulls[row_id] else default
+        value = self.values(name)[row_id]
+        if column["kind"] == "bool":
+            return bool(value)
+        ints = self._mask(name, "ints")
+        return int(value) if ints is not None and ints[row_id] else value
+
+    def record(self, row_id: int) -> dict:
+        """Materialize one listing as a dict, equal to the source record"""
+        record = {}
+        for name in self.columns:
+            value = self.value(name, row_id, _MISSING)
+            if value is not _MISSING:
+                record[name] = value
+        return record
+
+
+class SnapshotPropertyStore:
+    """
+    Property store backed by a memory-mapped binary snapshot of the JSON dataset.
+
+    The snapshot is (re)built automatically when it is missing, incompatible
+    or older than the JSON file, so startup only maps the file instead of
+    parsing it. Searches read the criteria columns directly from the mapping
+    (as NumPy views when numpy is installed) and only materialize matches.
+    """
+    def __init__(self, file_path: str, snapshot_path: str = None):
+        self.file_path = file_path
+        self.snapshot_path = snapshot_path or default_snapshot_path(file_path)
+        self.snapshot = None
+        self._source_mtime = None
+        self._lock = threading.Lock()
+        # guards swapping self.snapshot against searches picking it up
+        self._swap_lock = threading.Lock()
+
+    def _ensure_fresh(self):
+        source_mtime = os.stat(self.file_path).st_mtime_ns
+        if source_mtime == self._source_mtime:
+            return
+        with self._lock:
+            if source_mtime == self._source_mtime:
+                return
+            snapshot = None
+            if os.path.exists(self.snapshot_path) and os.stat(self.snapshot_path).st_mtime_ns >= source_mtime:
+                try:
+                    snapshot = PropertySnapshot(self.snapshot_path)
+                except ValueError:
+                    snapshot = None
+            if snapshot is None:
+                build_snapshot(self.file_path, self.snapshot_path)
+                snapshot = PropertySnapshot(self.snapshot_path)
+            with self._swap_lock:
+                previous, self.snapshot = self.snapshot, snapshot
+            self._source_mtime = source_mtime
+            if previous is not None:
+                previous.retire()
+
+    def _acquire(self) -> PropertySnapshot:
+        """The current snapshot, kept open until release() even if a reload replaces it"""
+        self._ensure_fresh()
+        with self._swap_lock:
+            snapshot = self.snapshot
+            snapshot.acquire()
+        return snapshot
+
+    def iter_records(self):
+        """Iterate over every property in the dataset"""
+        snapshot = self._acquire()
+
+        def records():
+            try:
+                for row_id in range(snapshot.rows):
+                    yield snapshot.record(row_id)
+            finally:
+                snapshot.release()
+        return records()
+
+    def _row_test(self, snapshot: PropertySnapshot, name: str, value, partial_search: bool):
+        """(column values, test on a raw column value) for one criterion"""
+        column = snapshot.columns.get(name)
+        if column is None:
+            return None, lambda raw: False
+        kind = column["kind"]
+        if kind == "str":
+            code = snapshot.code_of(name, value)
+            return snapshot.values(name), lambda raw: raw == code and code >= 0
+        if kind == "json":
+            return snapshot.values(name), lambda raw: raw >= 0 and snapshot.decode(name, raw) == value
+        if not isinstance(value, (bool, int, float)):
+            return None, lambda raw: False
+        if name == "year_built":
+            return snapshot.values(name), (lambda raw: raw >= value) if partial_search else (lambda raw: raw > value)
+        return snapshot.values(name), lambda raw: raw == value
+
+    def _numpy_mask(self, snapshot: PropertySnapshot, name: str, value, partial_search: bool):
+        column = snapshot.columns.get(name)
+        if column is None or column["kind"] == "json":
+            return None
+        values = np.frombuffer(snapshot.values(name), dtype={"str": np.int32, "int64": np.int64,
+                                                              "float64": np.float64, "bool": np.uint8}[column["kind"]])
+        if column["kind"] == "str":
+            code = snapshot.code_of(name, value)
+            return values == code if code >= 0 else np.zeros(snapshot.rows, dtype=np.bool_)
+        if not isinstance(value, (bool, int, float)):
+            return np.zeros(snapshot.rows, dtype=np.bool_)
+        if name == "year_built":
+            mask = values >= value if partial_search else values > value
+        else:
+            mask = values == value
+        present = snapshot.present(name)
+        if present is not None:
+            mask &= np.frombuffer(present, dtype=np.uint8).astype(np.bool_)
+        return mask
+
+    def search(self, criteria: Dict, partial_search: bool, limit: int = None) -> List[dict]:
+        """Return the properties matching the criteria (at most limit), in dataset order"""
+        snapshot = self._acquire()
+        try:
+            return self._search(snapshot, criteria, partial_search, limit)
+        finally:
+            snapshot.release()
+
+    def _search(self, snapshot: PropertySnapshot, criteria: Dict, partial_search: bool, limit: int = None) -> List[dict]:
+        fields = criteria.keys() if partial_search else EXACT_SEARCH_FIELDS
+        active = {name: criteria[name] for name in fields if criteria.get(name) is not None}
+
+        if np is not None:
+            mask = np.ones(snapshot.rows, dtype=np.bool_)
+            remaining = {}
+            for name, value in active.items():
+                criterion_mask = self._numpy_mask(snapshot, name, value, partial_search)
+                if criterion_mask is None:
+                    remaining[name] = value
+                else:
+                    mask &= criterion_mask
+            row_ids = np.flatnonzero(mask).tolist()
+        else:
+            remaining, row_ids = active, range(snapshot.rows)
+
+        tests = []
+        for name, value in remaining.items():
+            values, test = self._row_test(snapshot, name, value, partial_search)
+            present = snapshot.present(name) if values is not None else None
+            tests.append((values, present, test))
+
+        def matches(row_id):
+            for values, present, test in tests:
+                if values is None or (present is not None and not present[row_id]) or not test(values[row_id]):
+                    return False
+            return True
+
+        return [snapshot.record(row_id) for row_id in islice(filter(matches, row_ids), limit)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a property dataset into a binary snapshot")
+    parser.add_argument("json_path", nargs="?", default=None, help="defaults to config.PROPERTY_DATA_PATH")
+    parser.add_argument("-o", "--output", default=None, help=f"defaults to <json_path>{SNAPSHOT_SUFFIX}")
+    args = parser.parse_args()
+
+    import module.config as config
+    json_path = args.json_path or config.PROPERTY_DATA_PATH
+    print(build_snapshot(json_path, args.output))
+
+
+if __name__ == "__main__":
+    main()
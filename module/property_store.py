@@ -0,0 +1,223 @@
+import os
+import bisect
+import threading
+from itertools import islice
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+import module.config as config
+from module.property_stream import iter_properties, load_properties
+
+# =============================================
+# Indexed, loaded-once property store
+# =============================================
+# fields answered by an equality (hash) index
+HASH_INDEXED_FIELDS = ["location", "num_of_bedrooms", "num_of_bathrooms", "has_garage"]
+# fields answered by a sorted index (range / equality via bisect)
+SORTED_INDEXED_FIELDS = ["year_built", "price"]
+# fields an exact search always compares against
+EXACT_SEARCH_FIELDS = ["location", "num_of_bedrooms", "num_of_bathrooms", "has_garage", "year_built", "price"]
+
+
+@dataclass
+class SearchCriteria:
+    """What the user is looking for, leave a field out (null) for no preference. year_built is the minimum year."""
+    location: Optional[str] = None
+    num_of_bedrooms: Optional[int] = None
+    num_of_bathrooms: Optional[float] = None
+    has_garage: Optional[bool] = None
+    year_built: Optional[int] = None
+    price: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        """The criteria that are set, as the dict the store and ranking work on"""
+        return {name: value for name, value in asdict(self).items() if value is not None}
+
+
+def matches_criteria(prop: dict, criteria: dict, partial_search: bool) -> bool:
+    """
+    Row-by-row predicate used by search_property.
+
+    Every criterion is an equality check except year_built, which is a minimum
+    (inclusive for partial searches, strictly newer for exact searches).
+    Criteria set to None are treated as "no preference".
+    """
+    fields = criteria.keys() if partial_search else EXACT_SEARCH_FIELDS
+    for k in fields:
+        v = criteria.get(k)
+        if v is None:
+            continue
+        value = prop.get(k)
+        if k == "year_built":
+            if value is None:
+                return False
+            if (value < v) if partial_search else (value <= v):
+                return False
+        elif value != v:
+            return False
+    return True
+
+
+class PropertyStore:
+    """
+    Keeps a property dataset in memory with secondary indexes.
+
+    The file is parsed once and re-parsed only when its mtime/size changes.
+    """
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        # (records, hash indexes, sorted indexes), replaced as a whole on reload:
+        #   hash indexes    field -> {value: [row ids]}
+        #   sorted indexes  field -> ([sorted values], [row ids in the same order])
+        self._data = ([], {}, {})
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def _file_signature(self):
+        stat = os.stat(self.file_path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @classmethod
+    def from_records(cls, records: List[dict]):
+        """Build a store over an in-memory dataset (never reloaded)"""
+        store = cls(None)
+        store._build_indexes(records)
+        return store
+
+    def _ensure_fresh(self):
+        """Reload the dataset if the file changed since the last load"""
+        if self.file_path is None:
+            return
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        with self._lock:
+            if signature == self._signature:
+                return
+            self._build_indexes(load_properties(self.file_path))
+            self._signature = signature
+
+    def _build_indexes(self, records: List[dict]):
+        hash_indexes = {name: {} for name in HASH_INDEXED_FIELDS}
+        for row_id, prop in enumerate(records):
+            for name, index in hash_indexes.items():
+                index.setdefault(prop.get(name), []).append(row_id)
+
+        sorted_indexes = {}
+        for name in SORTED_INDEXED_FIELDS:
+            pairs = sorted((prop[name], row_id) for row_id, prop in enumerate(records)
+                           if prop.get(name) is not None)
+            sorted_indexes[name] = ([value for value, _ in pairs], [row_id for _, row_id in pairs])
+
+        # swap in one go so concurrent readers never see a half-built store
+        self._data = (records, hash_indexes, sorted_indexes)
+
+    @property
+    def records(self) -> List[dict]:
+        return self._data[0]
+
+    def iter_records(self):
+        """Iterate over every property in the dataset"""
+        self._ensure_fresh()
+        return iter(self.records)
+
+    @staticmethod
+    def _lookup(data: tuple, name: str, value, partial_search: bool) -> Optional[List[int]]:
+        """Row ids matching one criterion, or None if the field is not indexed"""
+        _, hash_indexes, sorted_indexes = data
+        if name in hash_indexes:
+            return hash_indexes[name].get(value, [])
+        if name in sorted_indexes:
+            values, row_ids = sorted_indexes[name]
+            if name == "year_built":
+                # minimum year: inclusive for partial searches, strictly newer for exact ones
+                start = bisect.bisect_left(values, value) if partial_search else bisect.bisect_right(values, value)
+                return row_ids[start:]
+            return row_ids[bisect.bisect_left(values, value):bisect.bisect_right(values, value)]
+        return None
+
+    def search(self, criteria: Dict, partial_search: bool, limit: int = None) -> List[dict]:
+        """
+        Return the properties matching the criteria (at most limit), in dataset order.
+
+        Indexed criteria are resolved by index lookups and intersected; any
+        remaining criteria are checked on the (already narrowed) candidates.
+        """
+        self._ensure_fresh()
+        # read once: the records and indexes of a single load, even if a reload happens meanwhile
+        data = self._data
+        records, fields = data[0], criteria.keys() if partial_search else EXACT_SEARCH_FIELDS
+
+        candidate_lists = []
+        for name in fields:
+            value = criteria.get(name)
+            if value is None:
+                continue
+            row_ids = self._lookup(data, name, value, partial_search)
+            if row_ids is not None:
+                candidate_lists.append(row_ids)
+
+        if not candidate_lists:
+            return list(islice((prop for prop in records if matches_criteria(prop, criteria, partial_search)), limit))
+
+        # intersect starting from the most selective index
+        candidate_lists.sort(key=len)
+        candidates = set(candidate_lists[0])
+        for row_ids in candidate_lists[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(row_ids)
+
+        return list(islice((records[row_id] for row_id in sorted(candidates)
+                            if matches_criteria(records[row_id], criteria, partial_search)), limit))
+
+
+class StreamingPropertyStore:
+    """
+    Property store that never holds the dataset in memory.
+
+    Every search streams the file (JSON array or NDJSON) through the row
+    predicate and stops reading as soon as limit matches were found.
+    """
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def iter_records(self):
+        """Iterate over every property in the dataset"""
+        return iter_properties(self.file_path)
+
+    def search(self, criteria: Dict, partial_search: bool, limit: int = None) -> List[dict]:
+        """Return the properties matching the criteria (at most limit), in dataset order"""
+        matches = (prop for prop in iter_properties(self.file_path)
+                   if matches_criteria(prop, criteria, partial_search))
+        return list(islice(matches, limit))
+
+
+def get_store_class(backend: str):
+    """Map a backend name from config.PROPERTY_STORE_BACKEND to its store class"""
+    if backend == "indexed":
+        return PropertyStore
+    if backend == "stream":
+        return StreamingPropertyStore
+    if backend == "columnar":
+        # numpy is optional, only import it when the columnar backend is asked for
+        from module.property_columns import ColumnarPropertyStore
+        return ColumnarPropertyStore
+    if backend == "snapshot":
+        from module.property_snapshot import SnapshotPropertyStore
+        return SnapshotPropertyStore
+    raise ValueError(f"Unknown property store backend: {backend}")
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_property_store(file_path: str = None, backend: str = None) -> PropertyStore:
+    """Return the shared store for a data file, creating it on first use"""
+    file_path = os.path.abspath(file_path or config.PROPERTY_DATA_PATH)
+    backend = backend or config.PROPERTY_STORE_BACKEND
+    with _stores_lock:
+        store = _stores.get((file_path, backend))
+        if store is None:
+            store = _stores[(file_path, backend)] = get_store_class(backend)(file_path)
+    return store
@@ -0,0 +1,100 @@
+import json
+from typing import Iterator, List
+
+# =============================================
+# Streaming readers for property datasets
+# =============================================
+# Datasets can be a JSON array (data/property_data.json) or newline-delimited
+# JSON with one listing per line. Both readers yield one record at a time and
+# only keep a bounded chunk of the file in memory.
+CHUNK_SIZE = 1 << 20  # characters read per chunk
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+# what may follow an array element
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+def iter_ndjson(file_path: str) -> Iterator[dict]:
+    """Yield the records of a newline-delimited JSON file"""
+    with open(file_path, "r") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{file_path}:{line_number}: invalid JSON record ({e.msg})") from e
+
+
+def iter_json_array(file_path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """Yield the elements of a top-level JSON array without loading the whole file"""
+    with open(file_path, "r") as f:
+        buffer, pos, eof = "", 0, False
+        state = "start"  # start -> value -> separator -> value ... -> "]"
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+
+            if pos == len(buffer) or state == "value":
+                if pos == len(buffer) and eof:
+                    if state == "start":
+                        return  # empty file
+                    raise ValueError(f"{file_path}: unterminated JSON array")
+                if pos < len(buffer) and buffer[pos] == "]":
+                    return
+                if pos < len(buffer):
+                    try:
+                        record, end = _decoder.raw_decode(buffer, pos)
+                        # a value not followed by a delimiter yet may be cut short, e.g. "1." of "1.25e10"
+                        if eof or (end < len(buffer) and buffer[end] in _DELIMITERS):
+                            yield record
+                            pos, state = end, "separator"
+                            continue
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise ValueError(f"{file_path}: invalid JSON record in array")
+                # drop what was consumed, then read the next chunk
+                buffer, pos = buffer[pos:], 0
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+
+            char = buffer[pos]
+            if state == "start" and char == "[":
+                pos, state = pos + 1, "value"
+            elif state == "separator" and char == ",":
+                pos, state = pos + 1, "value"
+            elif state == "separator" and char == "]":
+                return
+            else:
+                raise ValueError(f"{file_path}: expected a JSON array of records, found {char!r}")
+
+
+def is_ndjson(file_path: str) -> bool:
+    """A file is NDJSON unless its first non-blank character opens a JSON array"""
+    with open(file_path, "r") as f:
+        while True:
+            chunk = f.read(4096)
+            if not chunk:
+                return False
+            stripped = chunk.lstrip()
+            if stripped:
+                return not stripped.startswith("[")
+
+
+def iter_properties(file_path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """Stream the records of a property dataset in either format"""
+    if is_ndjson(file_path):
+        return iter_ndjson(file_path)
+    return iter_json_array(file_path, chunk_size)
+
+
+def load_properties(file_path: str) -> List[dict]:
+    """Load a whole property dataset in either format"""
+    if is_ndjson(file_path):
+        return list(iter_ndjson(file_path))
+    with open(file_path, "r") as f:
+        return json.load(f)
@@ -0,0 +1,109 @@
+from typing import Optional
+import module.config as config
+from module.register_tools import register_tool
+from module.property_store import get_property_store, SearchCriteria
+from module.property_ranking import top_k_properties
+
+# =============================================
+# Registering tools with the decorator
+# =============================================
+# waits on the user, give up after a few minutes instead of stalling the loop
+@register_tool(tags=["get_search_criteria"], timeout=300)
+def get_search_criteria() -> dict:
+    """Prompt user for home search criteria and return them as a dictionary."""
+    location = input("Enter the desired location (e.g., Sloan Lake, Denver): ").strip()
+    
+    try:
+        num_of_bedrooms = int(input("Enter the number of bedrooms: "))
+    except ValueError:
+        num_of_bedrooms = None
+    
+    try:
+        num_of_bathrooms = float(input("Enter the number of bathrooms: "))
+    except ValueError:
+        num_of_bathrooms = None
+
+    has_garage_input = input("Do you want a garage? (yes/no): ").strip().lower()
+    if has_garage_input in ['yes', 'y']:
+        has_garage = True
+    elif has_garage_input in ['no', 'n']:
+        has_garage = False
+    else:
+        raise ValueError("Invalid input for garage preference. Please enter 'yes' or 'no'.")
+    
+    try:
+        year_built = int(input("Enter the minimum year built (e.g., 1970): "))
+    except ValueError:
+        year_built = None
+    
+    try:
+        partial_search_input = input("Do you want to include the properties that does't match all the criteria? (yes/no): ").strip().lower()
+        if partial_search_input in ['yes', 'y', '1']:
+            partial_search = True
+        elif partial_search_input in ['no', 'n', '0']:
+            partial_search = False
+        else:
+            raise ValueError("Invalid input for partial search.")
+    except ValueError:
+        partial_search = None
+
+    return {
+        "search_criteria":{
+            "location": location,
+            "num_of_bedrooms": num_of_bedrooms,
+            "num_of_bathrooms": num_of_bathrooms,
+            "has_garage": has_garage,
+            "year_built": year_built
+        },
+        "partial_search": partial_search
+    }
+
+
+
+# results may change when the data file does, so they are only reused for a minute;
+# the agent sees the first few matches with their main features, fetch_more_results has the rest
+@register_tool(tags=["search_property"], cache_ttl=60, timeout=30, page_size=5,
+               result_fields=["address", "location", "num_of_bedrooms", "num_of_bathrooms", "has_garage",
+                              "year_built", "price", "has_hoa", "hoa_fee", "match_score"])
+def search_property(search_criteria: SearchCriteria, partial_search: Optional[bool] = False, limit: int = None) -> list[dict]:
+    """search for property based on a set of criterias, returning at most limit properties.
+    With partial_search the closest properties are returned best first, each with a match_score between 0 and 1."""
+    # arrives as a SearchCriteria, validated and converted by the Environment
+    search_criteria = search_criteria.to_dict()
+
+    # the store keeps the dataset loaded and indexed between calls
+    store = get_property_store(config.PROPERTY_DATA_PATH)
+    if partial_search:
+        matches = top_k_properties(store.iter_records(), search_criteria, limit or config.PARTIAL_SEARCH_TOP_K)
+    else:
+        # a null partial_search is an exact search
+        matches = store.search(search_criteria, False, limit)
+    return {"search_results": matches} if matches else {"search_results": [], "message": "No properties found matching the criteria."}
+    
+@register_tool(tags=["summarize_options"], pure=True)
+def summarize_options(search_results: list[dict]) -> list[dict]:
+    """summarize the matched properties based on the properties features"""
+    if not search_results:
+        return [{"instrustion":"No properties found matching the criteria."}]
+    else:
+        return {"search_results": search_results, "instrustion":"Here are the matched properties based on the criteria, could you compare these properties? terminate the session with a helpful summary."}
+
+@register_tool(tags=["system"], terminal=True)
+def terminate(message: str) -> str:
+    """Terminates the agent's execution with a final message.
+
+    Args:
+        message: The final message to return before terminating
+
+    Returns:
+        The message with a termination note appended
+    """
+    return f"{message}\nTerminating..."
+
+# def search_in_file(file_name: str, search_term: str) -> list:
+#     """Search for a term in a file and return matching lines."""
+#     results = []
+#     with open(file_name, 'r') as f:
+#         for i, line in enumerate(f.readlines()):
+#             if search_term in line:
+#                 results.append((i+1, line.strip()))
@@ -0,0 +1,140 @@
+import uuid
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import module.config as config
+
+# =============================================
+# Compact tool results
+# =============================================
+# Tools registered with result_fields and/or page_size have their results
+# shaped by the Environment before they reach memory: the list in the result
+# (the result itself, or the first list in a result dict) is cut to its first
+# page_size items, each projected to result_fields. The full items are kept
+# out of band in a ResultStore and the shaped result carries a "result_page"
+# handle with the store reference, the total count and a next_cursor for the
+# fetch_more_results tool (module.result_tools) while items are left. Memory,
+# and so every later prompt, only holds the page and the handle. The Environment
+# makes its store the current one while a tool runs, so fetch_more_results reads
+# the store the page was put in.
+
+
+class ResultStore:
+    """Full tool results by reference, least recently used and expired ones are dropped"""
+    def __init__(self, max_entries: int = None, ttl: float = None):
+        from module.llm_cache import InMemoryLRUCache
+        self._entries = InMemoryLRUCache(max_entries=max_entries or config.RESULT_STORE_SIZE,
+                                         ttl=config.RESULT_STORE_TTL if ttl is None else ttl)
+
+    def put(self, tool: str, items: list, fields: List[str] = None, page_size: int = None) -> str:
+        ref = f"res_{uuid.uuid4().hex[:12]}"
+        self._entries.set(ref, {"tool": tool, "items": items, "fields": fields, "page_size": page_size})
+        return ref
+
+    def get(self, ref: str) -> Optional[dict]:
+        return self._entries.get(ref)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _find_items(result):
+    """(key of the list in a result dict or None, the list), (None, None) when the result holds no list"""
+    if isinstance(result, list):
+        return None, result
+    if isinstance(result, dict):
+        for key, value in result.items():
+            if isinstance(value, list):
+                return key, value
+    return None, None
+
+
+def project(items: list, fields: List[str] = None) -> list:
+    """Keep only the given fields of dict items"""
+    if not fields:
+        return items
+    return [{field: item[field] for field in fields if field in item} if isinstance(item, dict) else item
+            for item in items]
+
+
+def page_handle(ref: str, total: int, offset: int, shown: int) -> Dict:
+    end = offset + shown
+    return {
+        "result_ref": ref,
+        "total": total,
+        "offset": offset,
+        "shown": shown,
+        "next_cursor": f"{ref}:{end}" if end < total else None,
+    }
+
+
+def shape_result(store: ResultStore, tool: str, result, fields: List[str] = None, page_size: int = None):
+    """The result as memory should hold it, with the full items in store when anything was left out"""
+    key, items = _find_items(result)
+    if items is None:
+        return result
+    page = items[:page_size] if page_size else items
+    wanted = set(fields or ())
+    trimmed = len(page) < len(items) or bool(wanted) and any(
+        isinstance(item, dict) and not item.keys() <= wanted for item in page)
+    if not trimmed:
+        return result
+    ref = store.put(tool, items, fields, page_size)
+    handle = page_handle(ref, len(items), 0, len(page))
+    if key is None:
+        return {"items": project(page, fields), "result_page": handle}
+    shaped = dict(result)
+    shaped[key] = project(page, fields)
+    shaped["result_page"] = handle
+    return shaped
+
+
+def fetch_page(store: ResultStore, cursor: str, limit: int = None, all_fields: bool = False) -> Dict:
+    """The items at a cursor ("<result_ref>:<offset>"), raises ValueError for unknown or expired results"""
+    ref, _, offset = cursor.rpartition(":")
+    try:
+        offset = int(offset)
+    except ValueError:
+        raise ValueError(f"Invalid cursor '{cursor}', use the next_cursor of a result_page")
+    entry = store.get(ref)
+    if entry is None:
+        raise ValueError(f"Result '{ref}' has expired or does not exist, run the tool again")
+    items = entry["items"]
+    limit = limit or entry["page_size"] or len(items)
+    page = items[max(offset, 0):max(offset, 0) + limit]
+    return {
+        "tool": entry["tool"],
+        "items": page if all_fields else project(page, entry["fields"]),
+        "result_page": page_handle(ref, len(items), max(offset, 0), len(page)),
+    }
+
+
+_shared_result_store = None
+_shared_lock = threading.Lock()
+_current_result_store = contextvars.ContextVar("current_result_store", default=None)
+
+
+def get_shared_result_store() -> ResultStore:
+    """Store shared by every Environment that isn't given its own"""
+    global _shared_result_store
+    with _shared_lock:
+        if _shared_result_store is None:
+            _shared_result_store = ResultStore()
+        return _shared_result_store
+
+
+@contextmanager
+def using_result_store(store: ResultStore):
+    """Make store the current one for the calls made inside the block (and the worker threads they start)"""
+    token = _current_result_store.set(store)
+    try:
+        yield store
+    finally:
+        _current_result_store.reset(token)
+
+
+def get_current_result_store() -> ResultStore:
+    """The store of the Environment running the current tool call, the shared one outside of any"""
+    store = _current_result_store.get()
+    return store if store is not None else get_shared_result_store()
@@ -0,0 +1,17 @@
+from module.register_tools import register_tool
+from module.result_store import get_current_result_store, fetch_page
+
+# =============================================
+# Tools over stored results
+# =============================================
+# Results of tools registered with result_fields / page_size reach the agent a
+# page at a time (see module.result_store); this tool reads the rest from the
+# result store of the Environment running it.
+
+
+@register_tool(tags=["results"])
+def fetch_more_results(cursor: str, limit: int = None, all_fields: bool = False) -> dict:
+    """Fetch more items of a paged tool result, starting at cursor (the next_cursor of its result_page).
+    limit defaults to the tool's page size; all_fields returns every field of the items instead of the
+    summary fields, e.g. with cursor "<result_ref>:0" for the full details of the first page."""
+    return fetch_page(get_current_result_store(), cursor, limit, all_fields)
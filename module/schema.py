@@ -0,0 +1,334 @@
+import json
+import inspect
+import dataclasses
+from typing import Any, Callable, Dict, Literal, Union, get_args, get_origin, get_type_hints
+
+# =============================================
+# Type hints -> JSON schema and argument validators
+# =============================================
+# json_schema() describes a type hint to the LLM, compile_validator() turns the
+# same hint into a function that checks a value from a tool call and converts
+# it to the native type (a dataclass instance, an int sent as "3", an object
+# sent as a JSON string, ...). Validators are built once per type and reused.
+#
+# Supported: str, int, float, bool, None, Any, list/List[T], tuple/Tuple[...],
+# dict/Dict[str, T], Optional/Union, Literal and dataclasses. Other classes are
+# described as strings and passed through unchecked.
+
+# parameters filled in by the framework, never by the LLM
+SPECIAL_PARAMETERS = ["action_context", "action_agent"]
+
+_NONE = type(None)
+_PRIMITIVES = {str: "string", int: "integer", float: "number", bool: "boolean", _NONE: "null"}
+_TRUE = {"true", "yes", "y", "1"}
+_FALSE = {"false", "no", "n", "0"}
+
+
+class ToolArgumentError(ValueError):
+    """A tool call's arguments don't match the tool's signature"""
+    def __init__(self, path: str, message: str):
+        super().__init__(f"{path}: {message}" if path else message)
+        self.path = path
+
+
+def _describe(value) -> str:
+    text = repr(value)
+    return f"{type(value).__name__} {text[:60]}{'...' if len(text) > 60 else ''}"
+
+
+# ---------------------------------------------
+# schema generation
+# ---------------------------------------------
+def json_schema(tp) -> Dict:
+    """JSON schema of a type hint"""
+    if tp is Any:
+        return {}
+    if tp in _PRIMITIVES:
+        return {"type": _PRIMITIVES[tp]}
+    if dataclasses.is_dataclass(tp):
+        return _dataclass_schema(tp)
+
+    origin, args = get_origin(tp), get_args(tp)
+    if origin is Literal:
+        values = list(args)
+        types = {_PRIMITIVES.get(type(value)) for value in values}
+        schema = {"enum": values}
+        if len(types) == 1 and None not in types:
+            schema["type"] = types.pop()
+        return schema
+    if origin is Union:
+        members = [arg for arg in args if arg is not _NONE]
+        nullable = len(members) < len(args)
+        if len(members) == 1:
+            schema = json_schema(members[0])
+            if nullable and isinstance(schema.get("type"), str) and "enum" not in schema:
+                return {**schema, "type": [schema["type"], "null"]}
+            return {"anyOf": [schema, {"type": "null"}]} if nullable else schema
+        return {"anyOf": [json_schema(arg) for arg in args]}
+    if tp in (list, tuple) or origin in (list, tuple):
+        schema = {"type": "array"}
+        if origin is tuple and args and args[-1] is not Ellipsis:
+            schema["prefixItems"] = [json_schema(arg) for arg in args]
+            schema["minItems"] = schema["maxItems"] = len(args)
+        elif args:
+            schema["items"] = json_schema(args[0])
+        return schema
+    if tp is dict or origin is dict:
+        schema = {"type": "object"}
+        if len(args) == 2 and args[1] is not Any:
+            schema["additionalProperties"] = json_schema(args[1])
+        return schema
+    # anything else travels as text, as it always has
+    return {"type": "string"}
+
+
+def _dataclass_schema(cls) -> Dict:
+    hints = get_type_hints(cls)
+    schema = {"type": "object", "properties": {}, "required": []}
+    for f in dataclasses.fields(cls):
+        schema["properties"][f.name] = json_schema(hints.get(f.name, Any))
+        if f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING:
+            schema["required"].append(f.name)
+    if cls.__doc__ and not cls.__doc__.startswith(cls.__name__ + "("):
+        schema["description"] = inspect.cleandoc(cls.__doc__)
+    return schema
+
+
+def function_parameters_schema(func: Callable) -> Dict:
+    """JSON schema of a function's arguments, parameters without a default are required"""
+    signature = inspect.signature(func)
+    type_hints = get_type_hints(func)
+    schema = {"type": "object", "properties": {}, "required": []}
+    for name, param in signature.parameters.items():
+        if name in SPECIAL_PARAMETERS:
+            continue
+        schema["properties"][name] = json_schema(type_hints.get(name, str))
+        if param.default is inspect.Parameter.empty:
+            schema["required"].append(name)
+    return schema
+
+
+# ---------------------------------------------
+# compiled validators
+# ---------------------------------------------
+_validators: Dict[Any, Callable] = {}
+
+
+def compile_validator(tp) -> Callable[[Any, str], Any]:
+    """
+    Build (once per type) a function validator(value, path) that returns the value
+    converted to tp, or raises ToolArgumentError naming the offending path.
+    """
+    try:
+        return _validators[tp]
+    except (KeyError, TypeError):
+        pass
+    validator = _build_validator(tp)
+    try:
+        _validators[tp] = validator
+    except TypeError:
+        pass  # unhashable hint, not worth caching
+    return validator
+
+
+def _decode_json(value, path: str, expected: str):
+    """LLMs regularly send objects and arrays as JSON strings, accept those"""
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            raise ToolArgumentError(path, f"expected {expected}, got a string that isn't valid JSON")
+    return value
+
+
+def _validate_str(value, path):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise ToolArgumentError(path, f"expected string, got {_describe(value)}")
+
+
+def _validate_int(value, path):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    raise ToolArgumentError(path, f"expected integer, got {_describe(value)}")
+
+
+def _validate_float(value, path):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            pass
+    raise ToolArgumentError(path, f"expected number, got {_describe(value)}")
+
+
+def _validate_bool(value, path):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in _TRUE | _FALSE:
+        return value.strip().lower() in _TRUE
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    raise ToolArgumentError(path, f"expected boolean, got {_describe(value)}")
+
+
+def _validate_none(value, path):
+    if value is None:
+        return None
+    raise ToolArgumentError(path, f"expected null, got {_describe(value)}")
+
+
+def _passthrough(value, path):
+    return value
+
+
+_PRIMITIVE_VALIDATORS = {str: _validate_str, int: _validate_int, float: _validate_float,
+                         bool: _validate_bool, _NONE: _validate_none}
+
+
+def _build_validator(tp) -> Callable:
+    if tp is Any:
+        return _passthrough
+    if tp in _PRIMITIVE_VALIDATORS:
+        return _PRIMITIVE_VALIDATORS[tp]
+    if dataclasses.is_dataclass(tp):
+        return _dataclass_validator(tp)
+
+    origin, args = get_origin(tp), get_args(tp)
+    if origin is Literal:
+        choices = list(args)
+
+        def validate_literal(value, path):
+            if value in choices:
+                return value
+            raise ToolArgumentError(path, f"expected one of {choices}, got {_describe(value)}")
+        return validate_literal
+
+    if origin is Union:
+        nullable = _NONE in args
+        members = [compile_validator(arg) for arg in args if arg is not _NONE]
+
+        def validate_union(value, path):
+            if value is None and nullable:
+                return None
+            if len(members) == 1:
+                return members[0](value, path)
+            errors = []
+            for member in members:
+                try:
+                    return member(value, path)
+                except ToolArgumentError as e:
+                    errors.append(str(e))
+            raise ToolArgumentError(path, "matched none of the allowed types (" + "; ".join(errors) + ")")
+        return validate_union
+
+    if tp in (list, tuple) or origin in (list, tuple):
+        container = tuple if tuple in (tp, origin) else list
+        if origin is tuple and args and args[-1] is not Ellipsis:
+            positional = [compile_validator(arg) for arg in args]
+
+            def validate_fixed_tuple(value, path):
+                value = _decode_json(value, path, "array")
+                if not isinstance(value, (list, tuple)) or len(value) != len(positional):
+                    raise ToolArgumentError(path, f"expected an array of {len(positional)} items, got {_describe(value)}")
+                return tuple(item_validator(item, f"{path}[{i}]")
+                             for i, (item_validator, item) in enumerate(zip(positional, value)))
+            return validate_fixed_tuple
+
+        item_validator = compile_validator(args[0]) if args else _passthrough
+
+        def validate_array(value, path):
+            value = _decode_json(value, path, "array")
+            if not isinstance(value, (list, tuple)):
+                raise ToolArgumentError(path, f"expected array, got {_describe(value)}")
+            return container(item_validator(item, f"{path}[{i}]") for i, item in enumerate(value))
+        return validate_array
+
+    if tp is dict or origin is dict:
+        value_validator = compile_validator(args[1]) if len(args) == 2 else _passthrough
+
+        def validate_object(value, path):
+            value = _decode_json(value, path, "object")
+            if not isinstance(value, dict):
+                raise ToolArgumentError(path, f"expected object, got {_describe(value)}")
+            if value_validator is _passthrough:
+                return value
+            return {key: value_validator(item, f"{path}.{key}") for key, item in value.items()}
+        return validate_object
+
+    return _passthrough
+
+
+def _dataclass_validator(cls) -> Callable:
+    hints = get_type_hints(cls)
+    fields = {f.name: compile_validator(hints.get(f.name, Any)) for f in dataclasses.fields(cls) if f.init}
+    required = [f.name for f in dataclasses.fields(cls)
+                if f.init and f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING]
+
+    def validate_dataclass(value, path):
+        if isinstance(value, cls):
+            return value
+        value = _decode_json(value, path, "object")
+        if not isinstance(value, dict):
+            raise ToolArgumentError(path, f"expected object, got {_describe(value)}")
+        unknown = [key for key in value if key not in fields]
+        if unknown:
+            raise ToolArgumentError(path, f"unknown field(s) {unknown}, expected some of {list(fields)}")
+        missing = [name for name in required if name not in value]
+        if missing:
+            raise ToolArgumentError(path, f"missing required field(s) {missing}")
+        prefix = f"{path}." if path else ""
+        return cls(**{key: fields[key](item, prefix + key) for key, item in value.items()})
+    return validate_dataclass
+
+
+def compile_arguments_validator(func: Callable) -> Callable[[Dict], Dict]:
+    """
+    Build the validator of a tool's arguments: it rejects unknown and missing
+    arguments and converts each argument to its annotated type.
+    An argument whose default is None may always be None.
+    """
+    signature = inspect.signature(func)
+    type_hints = get_type_hints(func)
+    accepts_kwargs = any(param.kind is inspect.Parameter.VAR_KEYWORD for param in signature.parameters.values())
+    validators, required, nullable = {}, [], set()
+    for name, param in signature.parameters.items():
+        if name in SPECIAL_PARAMETERS or param.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+            continue
+        validators[name] = compile_validator(type_hints.get(name, Any))
+        if param.default is inspect.Parameter.empty:
+            required.append(name)
+        elif param.default is None:
+            nullable.add(name)
+
+    def validate_arguments(args: Dict) -> Dict:
+        if not isinstance(args, dict):
+            raise ToolArgumentError("", f"expected an object of arguments, got {_describe(args)}")
+        missing = [name for name in required if name not in args]
+        if missing:
+            raise ToolArgumentError("", f"missing required argument(s) {missing}")
+        validated = {}
+        for name, value in args.items():
+            validator = validators.get(name)
+            if validator is None:
+                if not accepts_kwargs:
+                    raise ToolArgumentError(name, f"unexpected argument, expected some of {list(validators)}")
+                validated[name] = value
+            elif value is None and name in nullable:
+                validated[name] = None
+            else:
+                validated[name] = validator(value, name)
+        return validated
+
+    return validate_arguments
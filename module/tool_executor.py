@@ -0,0 +1,165 @@
+import asyncio
+import traceback
+import threading
+import contextvars
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import module.config as config
+
+# =============================================
+# Isolated tool execution with timeouts
+# =============================================
+# Tools declare how they run in register_tool:
+#   isolation=None       run inline in the agent's thread (the default without a timeout)
+#   isolation="thread"   run on a shared worker thread pool (the default with a timeout);
+#                        on timeout the agent stops waiting, the thread is left to finish and
+#                        later calls go to a fresh pool, so a hung tool never holds up others
+#   isolation="process"  run in a child process that is killed on timeout, for tools that
+#                        can hang or must be hard-cancelled (the function must be importable)
+
+
+class ToolTimeoutError(Exception):
+    def __init__(self, tool_name: str, timeout: float):
+        super().__init__(f"Tool {tool_name} did not finish within {timeout} seconds")
+        self.tool_name = tool_name
+        self.timeout = timeout
+
+
+class ToolProcessError(Exception):
+    """An exception raised by a tool in its child process, with the child's traceback"""
+    def __init__(self, message: str, child_traceback: str):
+        super().__init__(message)
+        self.child_traceback = child_traceback
+
+
+def _process_entry(conn, function, args):
+    try:
+        # the timeout only starts once the child is up, startup cost is not the tool's
+        conn.send(("ready",))
+        conn.send(("ok", function(**args)))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}", traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+class ToolExecutor:
+    """Runs actions according to their isolation mode and timeout"""
+    def __init__(self, max_workers: int = None, start_method: str = None):
+        self.max_workers = max_workers or config.TOOL_WORKERS
+        self._mp = multiprocessing.get_context(start_method or config.TOOL_PROCESS_START_METHOD)
+        self._pool = None
+        self._lock = threading.Lock()
+        # pools given up on because a worker was still stuck in a tool past its timeout
+        self.abandoned_pools = 0
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tool-worker")
+            return self._pool
+
+    def _abandon_pool(self, pool: ThreadPoolExecutor):
+        """
+        A worker of pool is stuck past its tool's timeout (e.g. blocked reading stdin) and
+        can't be interrupted: new calls get a fresh pool instead of queuing behind it, the
+        old pool winds down as its other workers finish.
+        """
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+            self.abandoned_pools += 1
+        pool.shutdown(wait=False)
+
+    @staticmethod
+    def isolation(action) -> str:
+        isolation = getattr(action, "isolation", None)
+        if isolation:
+            return isolation
+        return "thread" if getattr(action, "timeout", None) else "inline"
+
+    def run(self, action, args: dict):
+        """Execute an action, raising ToolTimeoutError if it exceeds its timeout"""
+        isolation = self.isolation(action)
+        if isolation == "inline":
+            return action.execute(**args)
+        if isolation == "process":
+            return self._run_in_process(action, args)
+        if isolation != "thread":
+            raise ValueError(f"Unknown isolation mode for tool {action.name}: {isolation}")
+
+        pool = self._thread_pool()
+        future = pool.submit(contextvars.copy_context().run, action.execute, **args)
+        try:
+            return future.result(timeout=action.timeout)
+        except FutureTimeoutError:
+            # drops it if it has not started yet, a running thread can't be interrupted
+            if not future.cancel():
+                self._abandon_pool(pool)
+            raise ToolTimeoutError(action.name, action.timeout)
+
+    def _run_in_process(self, action, args: dict):
+        receiver, sender = self._mp.Pipe(duplex=False)
+        process = self._mp.Process(target=_process_entry, args=(sender, action.function, args), daemon=True)
+        process.start()
+        sender.close()
+        try:
+            try:
+                if receiver.poll(config.TOOL_PROCESS_START_TIMEOUT):
+                    receiver.recv()
+                if not receiver.poll(action.timeout):
+                    process.terminate()
+                    raise ToolTimeoutError(action.name, action.timeout)
+                outcome = receiver.recv()
+            except EOFError:
+                raise ToolProcessError(f"Tool {action.name} process exited with code {process.exitcode}", "")
+        finally:
+            receiver.close()
+            process.join(timeout=1)
+            if process.is_alive():
+                process.kill()
+        if outcome[0] == "error":
+            raise ToolProcessError(outcome[1], outcome[2])
+        return outcome[1]
+
+    async def arun(self, action, args: dict):
+        """Async counterpart of run(); coroutine tools are cancelled on timeout"""
+        isolation = self.isolation(action)
+        if isolation == "process":
+            return await asyncio.to_thread(self._run_in_process, action, args)
+        pool = future = None
+        if asyncio.iscoroutinefunction(action.function):
+            call = action.function(**args)
+        elif isolation == "inline":
+            return await action.aexecute(**args)
+        else:
+            # the tool pool, not the loop's default executor, so a stuck tool doesn't hold up loop shutdown
+            pool = self._thread_pool()
+            future = pool.submit(contextvars.copy_context().run, action.execute, **args)
+            call = asyncio.wrap_future(future)
+        try:
+            return await asyncio.wait_for(call, timeout=action.timeout)
+        except asyncio.TimeoutError:
+            if future is not None and future.running():
+                self._abandon_pool(pool)
+            raise ToolTimeoutError(action.name, action.timeout)
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+_shared_executor = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_tool_executor() -> ToolExecutor:
+    """Executor shared by every Environment that isn't given its own"""
+    global _shared_executor
+    with _shared_lock:
+        if _shared_executor is None:
+            _shared_executor = ToolExecutor()
+        return _shared_executor
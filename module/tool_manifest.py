@@ -0,0 +1,194 @@
+import os
+import sys
+import ast
+import json
+import hashlib
+import argparse
+import importlib
+import importlib.util
+import threading
+from typing import Dict, List, Optional
+import module.config as config
+from module.tool_schema import compile_tool_schema
+
+# =============================================
+# Lazy tool registry
+# =============================================
+# Tools are declared in a manifest (name, description, parameter schema, tags,
+# flags and import path) generated from the tool modules:
+#
+#   python -m module.tool_manifest            # rewrite module/tool_manifest.json
+#
+# load_tools() registers the manifest entries in config.TOOLS without importing
+# the tool modules; an entry's "function" stays None until Action resolves it
+# on first execution. When the manifest is missing or was generated from a
+# different version of a tool module or of a module/ module it imports (e.g.
+# the dataclasses its parameters use, or the schema code), the modules are
+# imported right away, so a stale manifest costs startup time but never correctness.
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tool_manifest.json")
+MANIFEST_VERSION = 2
+
+# copied from a registered tool into the manifest, and back into config.TOOLS
+_MANIFEST_FIELDS = ["description", "parameters", "terminal", "tags", "pure", "cache_ttl", "timeout", "isolation",
+                    "result_fields", "page_size"]
+
+_loaded = False
+_load_lock = threading.RLock()
+
+
+def _source_digest(module_name: str) -> Optional[str]:
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or not spec.origin or not os.path.isfile(spec.origin):
+        return None
+    with open(spec.origin, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _local_imports(module_name: str) -> List[str]:
+    """The module.* modules imported anywhere in a module's source, lazy imports included"""
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or not spec.origin or not os.path.isfile(spec.origin):
+        return []
+    with open(spec.origin, "rb") as f:
+        tree = ast.parse(f.read(), filename=spec.origin)
+    names, package = [], module_name.partition(".")[0]
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.append(node.module)
+            if node.module == package:
+                # from module import x, where x is a submodule
+                names.extend(f"{node.module}.{alias.name}" for alias in node.names)
+    prefix = package + "."
+    return [name for name in names if name.startswith(prefix) and importlib.util.find_spec(name) is not None]
+
+
+def _dependencies(modules: List[str]) -> List[str]:
+    """The tool modules and every module of their package they import, directly or not"""
+    seen, pending = set(), list(modules)
+    while pending:
+        module_name = pending.pop()
+        if module_name not in seen:
+            seen.add(module_name)
+            pending.extend(_local_imports(module_name))
+    return sorted(seen)
+
+
+def build_manifest(modules: List[str] = None) -> Dict:
+    """Import the tool modules and describe every tool they register"""
+    modules = modules or config.TOOL_MODULES
+    for module_name in modules:
+        importlib.import_module(module_name)
+    tools = {}
+    for name, tool in config.TOOLS.items():
+        function = tool.get("function")
+        if function is None or function.__module__ not in modules:
+            continue
+        tools[name] = {field: tool.get(field) for field in _MANIFEST_FIELDS}
+        tools[name]["import_path"] = f"{function.__module__}:{function.__qualname__}"
+    return {
+        "version": MANIFEST_VERSION,
+        "modules": list(modules),
+        # the schema depends on the modules the tools import too (dataclasses, schema code)
+        "sources": {module_name: _source_digest(module_name) for module_name in _dependencies(modules)},
+        "tools": tools,
+    }
+
+
+def write_manifest(path: str = MANIFEST_PATH, modules: List[str] = None) -> Dict:
+    manifest = build_manifest(modules)
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=4)
+        f.write("\n")
+    return manifest
+
+
+def read_manifest(path: str = MANIFEST_PATH, modules: List[str] = None) -> Optional[Dict]:
+    """The manifest at path, or None if it is missing or out of date with the tool modules or their imports"""
+    modules = modules or config.TOOL_MODULES
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION or sorted(manifest.get("modules", [])) != sorted(modules):
+        return None
+    for module_name, digest in manifest["sources"].items():
+        if digest is None or _source_digest(module_name) != digest:
+            return None
+    return manifest
+
+
+def register_manifest(manifest: Dict):
+    """Add the manifest's tools to config.TOOLS without importing them"""
+    for name, entry in manifest["tools"].items():
+        if config.TOOLS.get(name, {}).get("function") is not None:
+            continue  # already imported for real
+        tool = {field: entry.get(field) for field in _MANIFEST_FIELDS}
+        tool.update({
+            "schema": compile_tool_schema(name, entry["description"], entry["parameters"]),
+            "validate_args": None,
+            "function": None,
+            "import_path": entry["import_path"],
+        })
+        config.TOOLS[name] = tool
+        for tag in tool["tags"] or []:
+            names = config.TOOLS_BY_TAG.setdefault(tag, [])
+            if name not in names:
+                names.append(name)
+
+
+def load_tools(path: str = MANIFEST_PATH, modules: List[str] = None):
+    """Make the tools known in config.TOOLS, from the manifest when it is up to date (idempotent)"""
+    global _loaded
+    if _loaded:
+        return
+    with _load_lock:
+        if _loaded:
+            return
+        # set first: the tool modules being imported may ask for their tools again
+        _loaded = True
+        try:
+            manifest = read_manifest(path, modules)
+            if manifest is not None:
+                register_manifest(manifest)
+            else:
+                for module_name in modules or config.TOOL_MODULES:
+                    importlib.import_module(module_name)
+        except Exception:
+            _loaded = False
+            raise
+
+
+def resolve_tool(name: str, import_path: str = None) -> Dict:
+    """
+    The config.TOOLS entry of a tool with its function imported.
+    Importing the tool's module re-runs register_tool, which fills in the entry.
+    """
+    tool = config.TOOLS.get(name, {})
+    if tool.get("function") is not None:
+        return tool
+    import_path = import_path or tool.get("import_path")
+    if not import_path:
+        raise KeyError(f"Tool {name} is not registered")
+    module_name = import_path.partition(":")[0]
+    with _load_lock:
+        importlib.import_module(module_name)
+    tool = config.TOOLS.get(name, {})
+    if tool.get("function") is None:
+        raise ImportError(f"Importing {module_name} did not register tool {name} (is the tool manifest stale?)")
+    return tool
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regenerate the lazy tool manifest from the tool modules")
+    parser.add_argument("--output", default=MANIFEST_PATH)
+    parser.add_argument("modules", nargs="*", help="tool modules (default: config.TOOL_MODULES)")
+    args = parser.parse_args(argv)
+    manifest = write_manifest(args.output, args.modules or None)
+    print(f"Wrote {len(manifest['tools'])} tools from {', '.join(manifest['modules'])} to {args.output}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
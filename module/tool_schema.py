@@ -0,0 +1,64 @@
+import json
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Dict, List
+
+# =============================================
+# Precompiled tool schemas
+# =============================================
+# A tool's OpenAI schema is built and serialized once, when it is registered,
+# and the same ToolSchema is shared by every registry and Action that exposes
+# the tool. Prompts reuse the compiled dicts as they are and identify the tool
+# list by a digest of the precomputed JSON; LLMClient splices that JSON into the
+# request body, so nothing is rebuilt or re-serialized per turn. The dicts are
+# shared: treat them as read-only.
+
+# providers cap tool descriptions, longer docstrings are cut here once
+MAX_DESCRIPTION_CHARS = 1024
+
+
+@dataclass(frozen=True, eq=False)
+class ToolSchema:
+    name: str
+    openai_tool: Dict  # {"type": "function", "function": {...}} as sent to the LLM
+    json: str          # canonical JSON of openai_tool
+    digest: str        # sha256 of json
+
+
+_compiled: Dict[tuple, ToolSchema] = {}
+_compiled_lock = threading.Lock()
+
+
+def compile_tool_schema(name: str, description: str, parameters: Dict) -> ToolSchema:
+    """Compile a tool's schema, the same definition always gives back the same ToolSchema"""
+    openai_tool = {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": description[:MAX_DESCRIPTION_CHARS],
+            "parameters": parameters,
+        },
+    }
+    text = json.dumps(openai_tool, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    key = (name, text)
+    with _compiled_lock:
+        schema = _compiled.get(key)
+        if schema is None:
+            schema = _compiled[key] = ToolSchema(
+                name=name,
+                openai_tool=openai_tool,
+                json=text,
+                digest=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            )
+    return schema
+
+
+def tools_json(schemas: List[ToolSchema]) -> str:
+    """JSON array of the tools, joined from the precomputed pieces"""
+    return "[" + ",".join(schema.json for schema in schemas) + "]"
+
+
+def tools_digest(schemas: List[ToolSchema]) -> str:
+    """Identifies a tool list (order matters) without serializing it again"""
+    return hashlib.sha256("|".join(schema.digest for schema in schemas).encode("ascii")).hexdigest()
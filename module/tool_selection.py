@@ -0,0 +1,63 @@
+import json
+from typing import Dict, Iterable, List
+from module.game import Action, ActionRegistry, Goal, Memory
+
+# =============================================
+# Per-turn tool selection
+# =============================================
+# With a ToolSelector the Agent offers the LLM only the tools that make sense
+# on this turn instead of the whole registry, which keeps the tool schemas in
+# each request small when the catalog is large. Rules name tags or tool names:
+#   follow_ups  previous tool -> what may come next (e.g. search -> summarize)
+#   goal_tags   goal name -> what serves that goal, used until a follow-up rule applies
+#   always      offered on every turn; terminal tools (terminate) always are
+# When no rule applies, every action is offered. The Agent still executes any
+# registered tool the LLM calls, selection only shapes the prompt.
+
+
+def previous_tool_names(memory: Memory) -> List[str]:
+    """Tools the agent called on its last turn, read from the latest assistant memory item"""
+    for item in reversed(memory.get_memories()):
+        if item.get("type") != "assistant":
+            continue
+        try:
+            decision = json.loads(item.get("content") or "")
+        except (TypeError, ValueError):
+            return []
+        calls = decision if isinstance(decision, list) else [decision]
+        return [call["tool"] for call in calls if isinstance(call, dict) and "tool" in call]
+    return []
+
+
+class ToolSelector:
+    def __init__(self,
+                 follow_ups: Dict[str, Iterable[str]] = None,
+                 goal_tags: Dict[str, Iterable[str]] = None,
+                 always: Iterable[str] = None):
+        self.follow_ups = {name: set(targets) for name, targets in (follow_ups or {}).items()}
+        self.goal_tags = {name: set(targets) for name, targets in (goal_tags or {}).items()}
+        self.always = set(always or [])
+
+    def wanted(self, goals: List[Goal], memory: Memory):
+        """Tags and tool names to offer on this turn, or None for every tool"""
+        previous = [name for name in previous_tool_names(memory) if name in self.follow_ups]
+        if previous:
+            return set().union(*(self.follow_ups[name] for name in previous))
+        goals = [goal.name for goal in goals if goal.name in self.goal_tags]
+        if goals:
+            return set().union(*(self.goal_tags[name] for name in goals))
+        return None
+
+    def select(self, registry: ActionRegistry, goals: List[Goal], memory: Memory) -> List[Action]:
+        actions = registry.get_actions()
+        wanted = self.wanted(goals, memory)
+        if wanted is None:
+            return actions
+        # names match directly, tags through the registry's tag index
+        selected = (wanted | registry.get_action_names_by_tags(wanted)) & registry.actions.keys()
+        if not selected:
+            return actions
+        # always may name tags too
+        selected |= (self.always | registry.get_action_names_by_tags(self.always)) & registry.actions.keys()
+        # registry order, so the same selection always yields the same (cached) tool list
+        return [action for action in actions if action.name in selected or action.terminal]
@@ -0,0 +1,211 @@
+import json
+import time
+import uuid
+import bisect
+import threading
+import contextvars
+from collections import defaultdict
+from typing import Dict, List
+
+# =============================================
+# Span-style tracing for the agent loop
+# =============================================
+# Agent.run opens a span around every stage of an iteration (prompt_build,
+# llm, parse, tool_execution, memory_update) and Environment opens a "tool"
+# span per executed tool. Finished spans go to the tracer's exporters; tool
+# spans also feed a per-tool latency histogram.
+
+# upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float("inf")]
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (milliseconds)"""
+    def __init__(self, buckets: List[float] = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, duration_ms: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, duration_ms)] += 1
+            self.count += 1
+            self.total_ms += duration_ms
+            self.max_ms = max(self.max_ms, duration_ms)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (0 < q <= 100)"""
+        target, seen = self.count * q / 100, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if count and seen >= target:
+                return min(bound, self.max_ms)
+        return 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": self.max_ms,
+            "buckets": {str(bound): count for bound, count in zip(self.buckets, self.counts) if count},
+        }
+
+
+class Span:
+    def __init__(self, tracer, name: str, attrs: dict):
+        parent = _current_span.get()
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start = 0.0
+        self.duration_ms = 0.0
+        self._token = None
+
+    def set(self, **attrs):
+        """Attach attributes to the span (e.g. token counts, tool name)"""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        self.start = time.time()
+        self._perf_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration_ms = (time.perf_counter() - self._perf_start) * 1000
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = repr(exc)
+        self.tracer.finish(self)
+        return False
+
+    def to_dict(self) -> dict:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": self.duration_ms,
+            "attrs": self.attrs,
+        }
+
+
+class Tracer:
+    """
+    Collects spans and aggregates per-stage totals and per-tool latency histograms.
+    exporters receive every finished span as a dict (see InMemoryCollector, JsonlExporter).
+    """
+    enabled = True
+
+    def __init__(self, exporters: list = None):
+        self.exporters = exporters or []
+        self.stage_totals = defaultdict(lambda: [0, 0.0])  # span name -> [count, total ms]
+        self.tool_latency = defaultdict(LatencyHistogram)  # tool name -> histogram
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **attrs) -> Span:
+        return Span(self, name, attrs)
+
+    def finish(self, span: Span):
+        with self._lock:
+            totals = self.stage_totals[span.name]
+            totals[0] += 1
+            totals[1] += span.duration_ms
+        if span.name == "tool":
+            self.tool_latency[span.attrs.get("tool")].observe(span.duration_ms)
+        if self.exporters:
+            record = span.to_dict()
+            for exporter in self.exporters:
+                exporter.export(record)
+
+    def summary(self) -> dict:
+        return {
+            "stages": {name: {"count": count, "total_ms": total} for name, (count, total) in self.stage_totals.items()},
+            "tools": {name: histogram.to_dict() for name, histogram in self.tool_latency.items()},
+        }
+
+    def close(self):
+        for exporter in self.exporters:
+            exporter.close()
+
+
+class _NullSpan:
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class NullTracer:
+    """Tracer used when tracing is off: every span is the same no-op object"""
+    enabled = False
+    _span = _NullSpan()
+
+    def span(self, name: str, **attrs):
+        return self._span
+
+    def summary(self) -> dict:
+        return {"stages": {}, "tools": {}}
+
+    def close(self):
+        pass
+
+
+NULL_TRACER = NullTracer()
+
+
+class InMemoryCollector:
+    """Keeps finished spans in a list, for tests and in-process analysis"""
+    def __init__(self):
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Dict):
+        with self._lock:
+            self.spans.append(span)
+
+    def close(self):
+        pass
+
+
+class JsonlExporter:
+    """Appends finished spans to a JSONL file, one span per line"""
+    def __init__(self, path: str, flush_every: int = 100):
+        self.path = path
+        self.flush_every = flush_every
+        self._buffer = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Dict):
+        with self._lock:
+            self._buffer.append(json.dumps(span, default=str))
+            if len(self._buffer) >= self.flush_every:
+                self._flush()
+
+    def _flush(self):
+        if self._buffer:
+            with open(self.path, "a") as f:
+                f.write("\n".join(self._buffer) + "\n")
+            self._buffer = []
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        self.flush()
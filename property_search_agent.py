@@ -1,9 +1,12 @@
-from litellm import completion
 import json
-from module.register_tools import *
 from module.game import *
 from module.agent_language import *
 from module.agent import *
+from module.memory import TokenBudgetMemory
+from module.agent_logging import configure_logging
+from module.tool_selection import ToolSelector
+from module.model_router import ModelRoute, ModelRouter
+from module.planner import FastPathPlanner
 import types
 
 
@@ -21,35 +24,127 @@ goals = [
     )
 ]
 
-# Create and populate the action registry
-action_registry = PythonActionRegistry(
-    tags=["get_search_criteria","search_property", "summarize_options","system"],
-    tool_names=["get_search_criteria", "search_property", "summarize_options", "terminate"]
+TOOL_TAGS = ["get_search_criteria", "search_property", "summarize_options", "results", "system"]
+TOOL_NAMES = ["get_search_criteria", "search_property", "summarize_options", "fetch_more_results", "terminate"]
+
+# tools offered per turn: the search tools first, then whatever follows the previous step
+# (terminate is always offered)
+TOOL_SELECTOR = ToolSelector(
+    goal_tags={goals[0].name: ["get_search_criteria", "search_property"]},
+    follow_ups={
+        "get_search_criteria": ["search_property"],
+        "search_property": ["search_property", "summarize_options", "results"],
+        "fetch_more_results": ["results", "summarize_options"],
+        "summarize_options": ["system"],
+    },
 )
 
-# print the action registry for debugging
-# for action in action_registry.get_actions():
-#     function_data = {attr: value for attr, value in vars(action).items() if not isinstance(value, types.FunctionType)}
-#     print(json.dumps(function_data, indent=4))
-
-# Define the agent language and environment
-agent_language = AgentFunctionCallingActionLanguage()
-environment = Environment()
-#generate_response = "Hello, Are you looking for a house?"
-
-# Create the agent
-property_search_agent = Agent(
-    goals=goals,
-    agent_language=agent_language,
-    action_registry=action_registry,
-    generate_response=generate_response,
-    environment=environment
+# model per turn: terminating after the summary and reading on through a paged result are
+# routine and go to the fast model, everything else (and any large prompt) to the large one;
+# the LLM only sees the turn after search_property when the planner found nothing to
+# summarize, and deciding whether to broaden the search is no routine step
+MODEL_ROUTER = ModelRouter(
+    routes=[
+        ModelRoute("fast", model="openai/gpt-4o-mini", max_tokens=512,
+                   input_cost_per_1k=0.00015, output_cost_per_1k=0.0006),
+        ModelRoute("reasoning", model="openai/gpt-4o", max_tokens=1024,
+                   input_cost_per_1k=0.0025, output_cost_per_1k=0.01),
+    ],
+    default="reasoning",
+    after_tools={"fetch_more_results": "fast", "summarize_options": "fast"},
+    large_prompt_tokens=6000,
 )
 
-# Run the agent
-user_input = "search for a property based on my criteria and provide a summary of the options"
-final_memory = property_search_agent.run(user_input, max_iterations=6)
 
-# Print the termination message (if any)
-for item in final_memory.get_memories():
-    print(f"\nMemory: {item['content']}")
\ No newline at end of file
+def search_with_criteria(result) -> dict:
+    """get_search_criteria returns search_property's arguments, search once the user has answered them all"""
+    if isinstance(result, dict) and result.get("search_criteria") and isinstance(result.get("partial_search"), bool):
+        return {"tool": "search_property",
+                "args": {"search_criteria": result["search_criteria"], "partial_search": result["partial_search"]}}
+    return None
+
+
+def summarize_results(result) -> dict:
+    """Matches are always summarized next; with none the LLM decides whether to broaden the search"""
+    if isinstance(result, dict) and result.get("search_results"):
+        return {"tool": "summarize_options", "args": {"search_results": result["search_results"]}}
+    return None
+
+
+# steps taken without asking the LLM, the final summary (terminate) is always written by the LLM
+FAST_PATH_PLANNER = FastPathPlanner({
+    "get_search_criteria": search_with_criteria,
+    "search_property": summarize_results,
+})
+
+
+def build_agent(generate_response=None,
+                tags: list = TOOL_TAGS,
+                tool_names: list = TOOL_NAMES,
+                environment: Environment = None,
+                tracer=None,
+                action_registry: ActionRegistry = None,
+                tool_selector: ToolSelector = TOOL_SELECTOR,
+                on_text=None,
+                model_router: ModelRouter = MODEL_ROUTER,
+                planner: FastPathPlanner = FAST_PATH_PLANNER) -> Agent:
+    """
+    Create the property search agent, generate_response can be swapped (e.g. for a scripted stand-in).
+    By default every agent shares one pooled, rate-limited LLM client (see module.llm_client).
+    """
+    if generate_response is None:
+        from module.llm_client import get_shared_llm_client
+        generate_response = get_shared_llm_client()
+    # Create and populate the action registry (a server passes one shared by all sessions)
+    action_registry = action_registry or PythonActionRegistry(tags=tags, tool_names=tool_names)
+
+    # print the action registry for debugging
+    # for action in action_registry.get_actions():
+    #     function_data = {attr: value for attr, value in vars(action).items() if not isinstance(value, types.FunctionType)}
+    #     print(json.dumps(function_data, indent=4))
+
+    # Define the agent language and environment
+    agent_language = AgentFunctionCallingActionLanguage()
+    environment = environment or Environment(tracer=tracer)
+    #generate_response = "Hello, Are you looking for a house?"
+
+    # Create the agent
+    return Agent(
+        goals=goals,
+        agent_language=agent_language,
+        action_registry=action_registry,
+        generate_response=generate_response,
+        environment=environment,
+        tracer=tracer,
+        tool_selector=tool_selector,
+        on_text=on_text,
+        model_router=model_router,
+        planner=planner
+    )
+
+
+def main():
+    # levels, payload truncation and async output are set in module/config.py
+    configure_logging()
+    # the shared LLM client streams the model's output: tools start as soon as their call
+    # is complete and the final summary is printed while it is generated
+    property_search_agent = build_agent(on_text=lambda text: print(text, end="", flush=True))
+
+    # Run the agent
+    user_input = "search for a property based on my criteria and provide a summary of the options"
+    # Keep the prompt under a fixed budget, older tool results get compacted
+    memory = TokenBudgetMemory(max_tokens=8000)
+    final_memory = property_search_agent.run(user_input, memory=memory, max_iterations=6)
+
+    # Print the termination message (if any)
+    for item in final_memory.get_memories():
+        print(f"\nMemory: {item['content']}")
+
+    # latency and cost of the turns sent to each model
+    for route, stats in MODEL_ROUTER.stats().items():
+        print(f"{route}: {stats['calls']} calls, {stats['avg_latency_s']:.2f} s avg, ${stats['cost']:.4f}")
+    print(f"LLM round trips saved by the fast path: {FAST_PATH_PLANNER.stats()['round_trips_saved']}")
+
+
+if __name__ == "__main__":
+    main()
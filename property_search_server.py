@@ -0,0 +1,66 @@
+import argparse
+from module.game import Environment, PythonActionRegistry, get_shared_tool_cache
+from module.memory import TokenBudgetMemory
+from module.agent_server import SessionManager, AgentHTTPServer
+from module.agent_logging import configure_logging, get_logger
+from module.property_store import get_property_store
+from module.llm_client import get_shared_llm_client
+from property_search_agent import build_agent
+import module.config as config
+
+logger = get_logger("server")
+
+# get_search_criteria reads from stdin, a server gets the criteria in the user's message instead
+SERVER_TOOL_TAGS = ["search_property", "summarize_options", "results", "system"]
+SERVER_TOOL_NAMES = ["search_property", "summarize_options", "fetch_more_results", "terminate"]
+
+
+def build_manager(generate_response=None, max_workers: int = None, tracer=None) -> SessionManager:
+    """
+    Load everything sessions share once, then hand out cheap per-session agents.
+    Without a generate_response the sessions share one pooled LLM client, and so its limits.
+    """
+    action_registry = PythonActionRegistry(tags=SERVER_TOOL_TAGS, tool_names=SERVER_TOOL_NAMES)
+    environment = Environment(tracer=tracer)
+
+    # load and index the dataset now rather than in the first user's turn
+    next(get_property_store(config.PROPERTY_DATA_PATH).iter_records(), None)
+
+    def agent_factory():
+        # the agent language caches per-session prompt state, so each session gets its own
+        return build_agent(generate_response=generate_response,
+                           environment=environment,
+                           tracer=tracer,
+                           action_registry=action_registry)
+
+    return SessionManager(agent_factory,
+                          memory_factory=lambda: TokenBudgetMemory(max_tokens=8000),
+                          max_workers=max_workers,
+                          max_iterations=6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the property search agent over HTTP")
+    parser.add_argument("--host", default=config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=config.SERVER_WORKERS)
+    args = parser.parse_args()
+
+    configure_logging()
+    manager = build_manager(max_workers=args.workers)
+    server = AgentHTTPServer((args.host, args.port), manager,
+                             extra_stats=lambda: {"tool_cache": get_shared_tool_cache().stats(),
+                                                  "llm": get_shared_llm_client().stats()})
+    logger.info("Serving the property search agent on http://%s:%d", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        manager.shutdown()
+        get_shared_llm_client().close()
+
+
+if __name__ == "__main__":
+    main()
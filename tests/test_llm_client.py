@@ -0,0 +1,132 @@
+import json
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from module.game import Prompt
+from module.llm_client import LLMClient, LLMRequestError, LLMStreamError
+from benchmarks.llm_stub_server import StubLLMServer
+
+TERMINATE = {"type": "function", "function": {"name": "terminate", "parameters": {"type": "object"}}}
+PROMPT = Prompt(messages=[{"role": "user", "content": "find me a house"}], tools=[TERMINATE])
+
+
+@pytest.fixture
+def make_client():
+    """Start a stub endpoint with the given options and return a client for it"""
+    servers, clients = [], []
+
+    def make(max_in_flight: int = 4, max_retries: int = 4, tokens_per_minute: float = None, **stub_options):
+        server = StubLLMServer(**{"latency": 0.0, **stub_options}).start()
+        client = LLMClient(api_base=server.api_base, api_key="stub", max_in_flight=max_in_flight,
+                           max_retries=max_retries, backoff_base=0.001, backoff_max=0.01,
+                           tokens_per_minute=tokens_per_minute)
+        servers.append(server)
+        clients.append(client)
+        return server, client
+
+    yield make
+    for client in clients:
+        client.close()
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_completion_returns_tool_call_text(make_client):
+    _, client = make_client()
+    assert json.loads(client(PROMPT)) == {"tool": "terminate",
+                                          "args": {"message": "Here is a summary of the matching properties."}}
+    assert client.stats()["tokens"] == 120
+
+
+def test_rate_limited_requests_are_retried(make_client):
+    server, client = make_client(fail_every=2)
+    for _ in range(3):
+        assert client(PROMPT)
+    assert server.counters["rate_limited"] == 2
+    assert client.stats()["retries"] == 2
+    assert client.stats()["errors"] == 0
+
+
+def test_retry_waits_for_retry_after(make_client):
+    _, client = make_client(fail_every=2, retry_after=0.3)
+    client(PROMPT)
+    start = time.perf_counter()
+    client(PROMPT)  # rate limited once, then answered
+    assert time.perf_counter() - start >= 0.3
+
+
+def test_rate_limit_error_carries_retry_after(make_client):
+    _, client = make_client(max_retries=0, fail_every=1, retry_after=2)
+    with pytest.raises(LLMRequestError) as error:
+        client(PROMPT)
+    assert error.value.status == 429
+    assert error.value.retry_after == 2.0
+    assert client.stats()["errors"] == 1
+
+
+def test_in_flight_requests_are_capped(make_client):
+    server, client = make_client(max_in_flight=2, latency=0.05)
+    with ThreadPoolExecutor(8) as pool:
+        assert all(pool.map(lambda _: client(PROMPT), range(8)))
+    assert server.counters["max_concurrent"] == 2
+    # the pooled session keeps its connections alive, at most one per in-flight slot
+    assert server.counters["connections"] <= 2
+
+
+def test_stream_delivers_tool_calls_and_text(make_client):
+    _, client = make_client()
+    calls = []
+    text = client.stream(PROMPT, on_tool_call=lambda index, call: calls.append((index, call)))
+    assert text == client(PROMPT)
+    assert calls == [(0, {"tool": "terminate", "args": {"message": "Here is a summary of the matching properties."}})]
+
+    chunks = []
+    text = client.stream(Prompt(messages=PROMPT.messages), on_text=chunks.append)
+    assert text == "Stub reply." == "".join(chunks)
+
+
+def test_stream_is_retried_only_while_opening(make_client):
+    server, client = make_client(fail_every=2)
+    client.stream(PROMPT)
+    client.stream(PROMPT)  # the 429 comes before anything was streamed
+    assert client.stats()["retries"] == 1
+
+    server, client = make_client(cut_streams=True)
+    with pytest.raises(LLMStreamError):
+        client.stream(PROMPT)
+    assert server.counters["requests"] == 1
+    assert client.stats()["retries"] == 0
+
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_used_tokens_are_counted_and_refunded(make_client, streamed):
+    _, client = make_client(tokens_per_minute=100000)
+    client.token_bucket.rate = 0  # no refill, so the bucket shows exactly what was kept
+    if streamed:
+        client.stream(PROMPT)
+    else:
+        client(PROMPT)
+    assert client.stats()["tokens"] == 120
+    # the bucket holds the 120 tokens used, not the estimate of prompt + max_tokens
+    assert client.token_bucket.capacity - client.token_bucket.tokens == 120
+
+
+def test_estimate_counts_the_tool_schemas(make_client):
+    _, client = make_client()
+    body = client._request_body(PROMPT.messages, PROMPT.tools, None, None, stream=False)
+    without_tools = client._estimate(dict(body, tools=None))
+    assert client._estimate(body) > without_tools
+    assert client._estimate(body, json.dumps(PROMPT.tools)) == client._estimate(body)
+
+
+def test_precomputed_tools_json_is_sent_as_is(make_client):
+    _, client = make_client()
+    tools_json = json.dumps(PROMPT.tools, separators=(",", ":"))
+    body = client._request_body(PROMPT.messages, PROMPT.tools, None, None, stream=True)
+    encoded = client._encode(body, tools_json)
+    assert json.loads(encoded) == body
+    assert tools_json.encode("utf-8") in encoded
+
+    prompt = Prompt(messages=PROMPT.messages, tools=PROMPT.tools, metadata={"tools_json": tools_json})
+    assert client(prompt) == client.stream(prompt) == client(PROMPT)
@@ -0,0 +1,24 @@
+from module.memory import TokenBudgetMemory, truncate_summary, CHARS_PER_TOKEN
+
+
+def test_short_items_are_not_summarized():
+    content = "x" * (150 * CHARS_PER_TOKEN - 10)
+    assert truncate_summary({"content": content}, 150) == content
+    summary = truncate_summary({"content": "x" * 1000}, 150)
+    assert summary.endswith(f"[compacted, {1000 - 150 * CHARS_PER_TOKEN} characters omitted]")
+
+
+def test_revision_only_changes_when_older_items_do():
+    memory = TokenBudgetMemory(max_tokens=100, keep_recent=10)
+    for _ in range(5):
+        memory.add_memory({"type": "user", "content": "y" * 1000})
+    # over budget, but every item is one of the keep_recent ones
+    assert memory.revision == 0
+
+    memory = TokenBudgetMemory(max_tokens=1000, keep_recent=1)
+    memory.add_memory({"type": "user", "content": "task"})
+    memory.add_memory({"type": "user", "content": "y" * 2000})
+    memory.add_memory({"type": "user", "content": "z" * 2000})
+    assert memory.revision == 1
+    assert memory.items[1]["compacted"]
+    assert memory.total_tokens <= memory.max_tokens
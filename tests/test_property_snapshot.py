@@ -0,0 +1,65 @@
+import os
+import json
+import pytest
+from module.property_store import PropertyStore
+from module.property_snapshot import SnapshotPropertyStore, PropertySnapshot, build_snapshot
+from benchmarks.synthetic import make_properties
+
+# nulls, missing keys, ints next to floats and odd types, all must come back as they were
+EDGE_RECORDS = [
+    {"location": "Sloan Lake, Denver", "num_of_bedrooms": 3, "num_of_bathrooms": 2, "has_garage": True,
+     "year_built": 1990, "price": 500000, "tags": ["quiet"]},
+    {"location": None, "num_of_bedrooms": None, "num_of_bathrooms": 2.5, "has_garage": None,
+     "year_built": None, "price": 500000.0, "tags": None},
+    {"location": "Highland, Denver", "price": 2 ** 60, "tags": {"nested": [1, 2]}},
+    {},
+    {"location": "Highland, Denver", "num_of_bedrooms": 2, "num_of_bathrooms": 1, "has_garage": False,
+     "year_built": 2015, "price": 1.5, "hoa_fee": 0},
+]
+
+QUERIES = [
+    {"location": "Highland, Denver"},
+    {"num_of_bathrooms": 2.5},
+    {"num_of_bathrooms": 2, "has_garage": True},
+    {"year_built": 1990},
+    {"price": 500000},
+    {"location": "Nowhere"},
+    {"tags": ["quiet"]},
+]
+
+
+def write_json(tmp_path, records) -> str:
+    path = os.path.join(tmp_path, "properties.json")
+    with open(path, "w") as f:
+        json.dump(records, f)
+    return path
+
+
+@pytest.mark.parametrize("records", [EDGE_RECORDS, make_properties(500)], ids=["edge_cases", "synthetic"])
+def test_snapshot_records_equal_the_json(tmp_path, records):
+    path = write_json(tmp_path, records)
+    snapshot = PropertySnapshot(build_snapshot(path))
+    try:
+        assert snapshot.rows == len(records)
+        assert [snapshot.record(row_id) for row_id in range(snapshot.rows)] == records
+    finally:
+        snapshot.close()
+    assert list(SnapshotPropertyStore(path).iter_records()) == records
+
+
+@pytest.mark.parametrize("partial_search", [False, True])
+@pytest.mark.parametrize("criteria", QUERIES)
+def test_snapshot_search_equals_the_indexed_store(tmp_path, criteria, partial_search):
+    path = write_json(tmp_path, EDGE_RECORDS)
+    expected = PropertyStore(path).search(criteria, partial_search)
+    assert SnapshotPropertyStore(path).search(criteria, partial_search) == expected
+
+
+def test_snapshot_is_rebuilt_when_the_json_changes(tmp_path):
+    path = write_json(tmp_path, EDGE_RECORDS)
+    store = SnapshotPropertyStore(path)
+    assert len(list(store.iter_records())) == len(EDGE_RECORDS)
+    write_json(tmp_path, EDGE_RECORDS[:2])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert list(store.iter_records()) == EDGE_RECORDS[:2]
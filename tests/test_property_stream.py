@@ -0,0 +1,52 @@
+import json
+import pytest
+from module.property_stream import iter_json_array, iter_properties, load_properties
+
+RECORDS = [
+    {"address": "1 Main St", "location": "Sloan Lake, Denver", "price": 525000.5, "num_of_bathrooms": 2.5},
+    {"address": "2 \"Quoted\" Ave, [unit] {3}", "location": None, "price": 1e6, "tags": ["a", ",", "]"]},
+    {"address": "3 Élan Ct", "nested": {"list": [1, [2, [3]]], "empty": {}}, "has_garage": False},
+    {},
+    {"address": "5 Last Rd", "year_built": 1999},
+]
+
+
+@pytest.fixture(params=["compact", "indented"])
+def array_file(tmp_path, request):
+    path = tmp_path / "properties.json"
+    with open(path, "w") as f:
+        json.dump(RECORDS, f, indent=4 if request.param == "indented" else None)
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64])
+def test_json_array_round_trips_at_any_chunk_size(array_file, chunk_size):
+    assert list(iter_json_array(array_file, chunk_size)) == RECORDS
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64])
+def test_numbers_cut_at_a_chunk_boundary_are_read_whole(tmp_path, chunk_size):
+    path = tmp_path / "numbers.json"
+    path.write_text("[123456789, 1.25e10, -42 ,7]")
+    assert list(iter_json_array(str(path), chunk_size)) == [123456789, 1.25e10, -42, 7]
+
+
+@pytest.mark.parametrize("text", ["", "[]", "  [ ]  "])
+def test_empty_arrays(tmp_path, text):
+    path = tmp_path / "empty.json"
+    path.write_text(text)
+    assert list(iter_json_array(str(path), 3)) == []
+
+
+@pytest.mark.parametrize("text", ["[{\"a\": 1}", "[{\"a\": 1} {\"b\": 2}]", "{\"a\": 1}", "[{\"a\": }]"])
+def test_malformed_arrays_are_rejected(tmp_path, text):
+    path = tmp_path / "bad.json"
+    path.write_text(text)
+    with pytest.raises(ValueError):
+        list(iter_json_array(str(path), 3))
+
+
+def test_ndjson_and_array_files_load_the_same(array_file, tmp_path):
+    ndjson = tmp_path / "properties.ndjson"
+    ndjson.write_text("\n".join(json.dumps(record) for record in RECORDS) + "\n\n")
+    assert list(iter_properties(str(ndjson))) == RECORDS == load_properties(array_file)
@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from typing import Dict, List, Literal, Optional, Tuple, Union
+import pytest
+from module.schema import ToolArgumentError, compile_validator, compile_arguments_validator
+from module.property_store import SearchCriteria
+
+
+@dataclass
+class Room:
+    name: str
+    size: float = 0.0
+
+
+@dataclass
+class House:
+    rooms: List[Room]
+    kind: Literal["flat", "house"] = "house"
+    owner: Optional[str] = None
+
+
+def tool(house: House, floors: int, note: Optional[str] = None, sorted_by: Literal["price", "size"] = "price"):
+    pass
+
+
+validate_args = compile_arguments_validator(tool)
+
+
+@pytest.mark.parametrize("tp, value, expected", [
+    (Optional[int], None, None),
+    (Optional[int], "3", 3),
+    (Optional[float], 2, 2.0),
+    (Optional[bool], "yes", True),
+    (Union[int, str], "x", "x"),
+    (Literal["a", "b"], "b", "b"),
+    (List[int], "[1, 2.0]", [1, 2]),
+    (Tuple[int, str], [1, 2], (1, "2")),
+    (Dict[str, float], {"a": "1.5"}, {"a": 1.5}),
+])
+def test_values_are_coerced(tp, value, expected):
+    result = compile_validator(tp)(value, "arg")
+    assert result == expected
+    assert type(result) is type(expected)
+
+
+@pytest.mark.parametrize("tp, value", [
+    (Optional[int], "three"),
+    (int, True),
+    (int, 2.5),
+    (bool, 2),
+    (Literal["a", "b"], "c"),
+    (List[int], "[1, 2"),
+    (Tuple[int, str], [1]),
+    (Dict[str, int], ["not", "an", "object"]),
+])
+def test_bad_values_are_rejected(tp, value):
+    with pytest.raises(ToolArgumentError):
+        compile_validator(tp)(value, "arg")
+
+
+def test_dataclass_arguments_are_built():
+    args = validate_args({"house": '{"rooms": [{"name": "kitchen", "size": "12"}], "kind": "flat"}', "floors": 2.0})
+    assert args == {"house": House(rooms=[Room("kitchen", 12.0)], kind="flat"), "floors": 2}
+    assert type(args["floors"]) is int
+
+
+@pytest.mark.parametrize("args, path", [
+    ({"house": {"rooms": [{"size": 3}]}, "floors": 1}, "house.rooms[0]"),
+    ({"house": {"rooms": [], "kind": "castle"}, "floors": 1}, "house.kind"),
+    ({"house": {"rooms": [], "garden": True}, "floors": 1}, "house"),
+    ({"house": {"rooms": []}, "floors": "two"}, "floors"),
+    ({"house": {"rooms": []}}, ""),
+    ({"house": {"rooms": []}, "floors": 1, "colour": "red"}, "colour"),
+    ({"house": {"rooms": []}, "floors": 1, "sorted_by": None}, "sorted_by"),
+])
+def test_bad_arguments_name_the_offending_path(args, path):
+    with pytest.raises(ToolArgumentError) as error:
+        validate_args(args)
+    assert error.value.path == path
+
+
+def test_arguments_defaulting_to_none_accept_null():
+    assert validate_args({"house": {"rooms": []}, "floors": 1, "note": None})["note"] is None
+
+
+def test_search_criteria_takes_fractional_bathrooms():
+    criteria = compile_validator(SearchCriteria)({"num_of_bathrooms": 2.5, "price": "450000"}, "search_criteria")
+    assert criteria.to_dict() == {"num_of_bathrooms": 2.5, "price": 450000}
+
+
+def test_search_property_accepts_a_null_partial_search():
+    from module.property_tools import search_property
+    args = compile_arguments_validator(search_property)({"search_criteria": {"location": "Denver"},
+                                                         "partial_search": None})
+    assert args == {"search_criteria": SearchCriteria(location="Denver"), "partial_search": None}